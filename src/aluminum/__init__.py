@@ -1,4 +1,5 @@
 import os
+import time
 from threading import Lock
 from urllib.parse import urljoin
 
@@ -6,11 +7,12 @@ from mcdreforged.api.all import *
 
 import aluminum.constant as constants
 import aluminum.utils as utils
-from aluminum.classes import PluginCatalogue, PluginManager
+from aluminum.classes import MirrorSelector, PluginCatalogue, PluginManager
 
 manager: PluginManager
 catalogue: PluginCatalogue
 config: constants.Configuration
+http: utils.HttpClient
 session_lock: Lock = Lock()
 global_server = constants.global_server
 
@@ -32,8 +34,11 @@ f'''§3§lAluminum§r§a {constants.PLUGIN_VERSION} §r{utils.trans('Usage:')}
     <sort_by: {', '.join(constants.SORTS)}>
     <keyword: QuotableText>
 {utils.trans('§lPlugin Management')}
-    §3{prefix} <install|disable|reload> <plugin_id>
-    §3{prefix} <load|enable> <file_path>'''
+    §3{prefix} install <plugin_id> [plugin_id ...]
+    §3{prefix} upgrade <--all|plugin_id ...>
+    §3{prefix} <disable|reload> <plugin_id>
+    §3{prefix} <load|enable> <file_path>
+    §3{prefix} cache [prune]'''
 )
         return
     msg = RTextList(RText(f"§3§lAluminum§r§a {constants.PLUGIN_VERSION} §r{utils.trans('Usage:')}"), '\n\n')
@@ -52,7 +57,7 @@ f'''§3§lAluminum§r§a {constants.PLUGIN_VERSION} §r{utils.trans('Usage:')}
         RTextList('\n',
               utils.trans('§lPlugin Management'), '\n    ',
               get_button('Install', RAction.suggest_command, 'install <plugin_id>'),
-            #   get_button('Upgrade', RAction.suggest_command, 'upgrade'), '\n    ',
+              get_button('Upgrade', RAction.suggest_command, 'upgrade --all'), '\n    ',
               get_button('List', RAction.run_command, 'list'),
               get_button('Enable', RAction.suggest_command, 'enable <file_path>'),
               get_button('Disable', RAction.suggest_command, 'disable <plugin_id>'),
@@ -63,10 +68,16 @@ f'''§3§lAluminum§r§a {constants.PLUGIN_VERSION} §r{utils.trans('Usage:')}
     src.reply(msg)
 
 
+def print_localized_help_message(src: CommandSource):
+    with utils.translator.language_of(src):
+        print_help_message(src)
+
+
 def register_commands():
     def parse_mcdr_commands(src: PlayerCommandSource, ctx):
         node = ' '.join(src.get_info().content.split()[1:])
         global_server.execute_command(f'!!MCDR plg {node}', src)
+        manager.invalidate()
 
     def sort_or_page(src, ctx):
         if utils.is_integer(ctx['sorted_by/page']):
@@ -87,32 +98,62 @@ def register_commands():
             return manager.browse(src, ctx.get('index', 'all'), page=page, page_size=page_size, keyword=ctx.get('keyword', None))
         else:
             page = int(ctx.get('page', 1))
-            return manager.browse(src, ctx.get('index', 'all'), ctx.get('sorted_by/page', 'name'), page=page, page_size=page_size, keyword=ctx.get('keyword', None))
+            sort_by = ctx.get('sorted_by/page', None if 'keyword' in ctx else 'name')
+            return manager.browse(src, ctx.get('index', 'all'), sort_by, page=page, page_size=page_size, keyword=ctx.get('keyword', None))
 
     global_server.register_command(
         Literal(constants.PREFIX).
         requires(
             lambda src: src.has_permission(config.permission)
-        ).runs(print_help_message)
+        ).requires(
+            lambda src: manager.ready.is_set(),
+            lambda: utils.trans('Aluminum is still loading, please try again later')
+        ).runs(print_localized_help_message)
         .then(Literal('test').runs(lambda: print(''))) #!
+        .then(
+            Literal('debug').then(
+                Literal('memory').runs(lambda src: manager.memory_report(src))
+            ).then(
+                Literal('render').runs(lambda src: manager.render_benchmark(src))
+                .then(
+                    Integer('rounds').at_min(1).runs(lambda src, ctx: manager.render_benchmark(src, ctx['rounds'])))
+            ).then(
+                Literal('trans').runs(lambda src: manager.trans_benchmark(src))
+                .then(
+                    Integer('rounds').at_min(1).runs(lambda src, ctx: manager.trans_benchmark(src, ctx['rounds']))))
+        )
         .then(
             Literal('update').runs(manager.check_update)
         ).then(
             Literal('install').then(
-                QuotableText('plugin_id')
-                .suggests(lambda: catalogue.plugins.keys())
-                .runs(lambda src, ctx: manager.install(src, ctx['plugin_id'])))
+                GreedyText('plugin_ids')
+                .suggests(lambda src, ctx: manager.suggest('catalogue', ctx, 'plugin_ids'))
+                .runs(lambda src, ctx: manager.install(src, ctx['plugin_ids'])))
+        ).then(
+            Literal('upgrade')
+            .runs(lambda src: manager.upgrade(src))
+            .then(
+                Literal('--all').runs(lambda src: manager.upgrade(src))
+            ).then(
+                GreedyText('plugin_ids')
+                .suggests(lambda src, ctx: manager.suggest('outdated', ctx, 'plugin_ids'))
+                .runs(lambda src, ctx: manager.upgrade(src, ctx['plugin_ids'])))
+        ).then(
+            Literal('cache')
+            .runs(lambda src: manager.show_cache(src))
+            .then(
+                Literal('prune').runs(lambda src: manager.prune_cache(src)))
         ).then(
             Literal('disable').then(
                 QuotableText('plugin_id')
-                .suggests(lambda: manager.plugins.keys())
-                .requires(lambda src, ctx: ctx['plugin_id'] in list(manager.plugins.keys()))
+                .suggests(lambda src, ctx: manager.suggest('installed', ctx, 'plugin_id'))
+                .requires(lambda src, ctx: ctx['plugin_id'] in manager.id_index('installed'))
                 .runs(lambda src, ctx: manager.disable(src, ctx['plugin_id'])))
         ).then(
             Literal('info').then(
                 QuotableText('plugin_id')
-                .suggests(lambda: list(manager.plugins.keys()) + list(manager.catalogue.plugins.keys()))
-                .requires(lambda src, ctx: ctx['plugin_id'] in list(manager.plugins.keys()) + list(manager.catalogue.plugins.keys()))
+                .suggests(lambda src, ctx: manager.suggest('known', ctx, 'plugin_id'))
+                .requires(lambda src, ctx: ctx['plugin_id'] in manager.id_index('known'))
                 .runs(lambda src, ctx: manager.info(src, ctx['plugin_id'])))
         ).then(
             Literal('search').then(
@@ -145,36 +186,45 @@ def register_commands():
         ).then(
             Literal('enable').then(
                 QuotableText('file_path')
-                .suggests(lambda: map(os.path.basename, global_server.get_disabled_plugin_list()))
+                .suggests(lambda src, ctx: manager.suggest('disabled', ctx, 'file_path'))
                 .runs(parse_mcdr_commands))
         ).then(
             Literal('load').then(
                 QuotableText('file_path')
-                .suggests(lambda: map(os.path.basename, global_server.get_unloaded_plugin_list()))
+                .suggests(lambda src, ctx: manager.suggest('unloaded', ctx, 'file_path'))
                 .runs(parse_mcdr_commands))
         ).then(
             Literal(['reload', 'unload']).then(
                 QuotableText('plugin_id')
-                .suggests(lambda: [i.id for i in manager.plugins])
+                .suggests(lambda src, ctx: manager.suggest('installed', ctx, 'plugin_id'))
                 .runs(parse_mcdr_commands))
         ).then(
             Literal(['list', 'reloadall', 'ra']).runs(parse_mcdr_commands)
         )
     )
-    global_server.register_help_message(constants.PREFIX[0], utils.trans(constants.PLUGIN_DESCRIPTION))
+    # A language -> text dict is translated by MCDR when shown, no need to load our translation here
+    global_server.register_help_message(constants.PREFIX[0], global_server.get_self_metadata().description)
 
 
 def on_load(server, prev):
-    global config, manager, catalogue, session_lock
+    global config, manager, catalogue, session_lock, http
+    start = time.perf_counter()
     # if hasattr(prev, 'session_lock') and type(prev.session_lock) == type(session_lock):
     #     session_lock = prev.session_lock
     utils.print_msg(global_server.get_plugin_command_source(),
                     constants.LOADED_BANNER if not prev else constants.RELOADED_BANNER)
     config = global_server.load_config_simple(target_class=constants.Configuration)
+    http = utils.HttpClient(config.connect_timeout, config.read_timeout, config.retries,
+                            pool_size=max(1, config.download_threads, len(config.mirrors) + 1) + 1)
+    mirrors = MirrorSelector(http, [config.source] + config.mirrors,
+                             utils.touch(os.path.join(global_server.get_data_folder(), 'cache')))
     config.source = urljoin(config.source, constants.PLUGIN_CATALOGUE)
-    manager = PluginManager(config, session_lock)
+    manager = PluginManager(config, session_lock, http, mirrors)
     catalogue = manager.catalogue
     register_commands()
+    manager.warm_up()
+    # Not translated, translations are loaded by warm-up
+    global_server.logger.info('Loaded in {:.1f} ms'.format((time.perf_counter() - start) * 1000))
 
 
 def on_unload(_):
@@ -182,3 +232,5 @@ def on_unload(_):
         manager.scheduler.stop()
     except:
         raise
+    finally:
+        http.close()
@@ -1,39 +1,63 @@
+from bisect import bisect_left
+import hashlib
 import json
 import os
+import platform
 import re
 import sched
+import shutil
 import subprocess
-from threading import Lock
+import sys
+import tempfile
+from threading import Event, Lock, RLock
 import time
-from typing import Dict, List, Optional, Union
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple, Union
 
-import pkg_resources
 from mcdreforged.api.decorator import new_thread
 from mcdreforged.api.rtext import RColor, RText, RAction, RStyle, RTextBase, RTextList
 from mcdreforged.api.types import CommandSource, Metadata, Version, VersionRequirement
 
 import aluminum.utils as utils
-from aluminum.constant import PLUGIN_CATALOGUE, PLUGIN_FOLDER, PYTHON, Configuration, global_server, PREFIX, N_INF, DEPENDENCY_BLACKLIST
+from aluminum.constant import CATALOGUE_FILES, CATALOGUE_SNAPSHOT_VERSION, CATALOGUE_SPOOL_SIZE, MIRROR_PROBE_INTERVAL, MIRROR_PROBE_SIZE, PLUGIN_CATALOGUE, PLUGIN_FOLDER, PYTHON, Configuration, global_server, PREFIX, N_INF, DEPENDENCY_BLACKLIST, INSTALLED_SNAPSHOT_TTL, RENDER_CACHE_SIZE, RESOLVE_ATTEMPTS, RESOLVE_ROUNDS, SORTS, VIEW_CACHE_SIZE
 from aluminum.decorator import execute_on_second_time
-from aluminum.exceptions import CatalogueLoadError, CatalogueUpdateError, DependencyInstallError, RequirementInstallError, PluginFolderError, SpecialRequirementError
+from aluminum.exceptions import NetworkError, CatalogueLoadError, CatalogueUpdateError, DependencyConflictError, DependencyCycleError, DependencyInstallError, RequirementInstallError, PluginFolderError, SpecialRequirementError
 from aluminum.utils import PrettySerializable, ValueDict
 
 
+@lru_cache(maxsize=4096)
+def parse_version(version: str) -> Version:
+    """Parse a version string. Results are shared, so don't modify them.
+    """
+    return Version(version)
+
+
+@lru_cache(maxsize=1024)
+def parse_version_requirement(requirement: str) -> VersionRequirement:
+    """Parse a version requirement string. Results are shared, so don't modify them.
+    """
+    return VersionRequirement(requirement)
+
+
 class Dependency:
     id: str
     version_requirement: VersionRequirement
+    PATTERN = re.compile(r'^(?P<id>[\w\-]+)(?P<version_requirement>.*)$')
 
     def __init__(self, dependency_spec, version_requirement: Optional[Union[str, VersionRequirement]] = None) -> None:
         if version_requirement:
             self.id = dependency_spec
-            self.version_requirement = VersionRequirement(version_requirement)
+            self.version_requirement = version_requirement if isinstance(version_requirement, VersionRequirement) \
+                else parse_version_requirement(version_requirement)
         else:
-            pattern = r'^(?P<id>[\w\-]+)(?P<version_requirement>.*)$'
-            match = re.match(pattern, dependency_spec)
+            match = self.PATTERN.match(dependency_spec)
             if match:
                 self.id = match.group('id')
                 version_requirement = match.group('version_requirement') or '*'
-                self.version_requirement = VersionRequirement(version_requirement)
+                self.version_requirement = parse_version_requirement(version_requirement)
             else:
                 raise ValueError(f'Invalid dependency specification: {dependency_spec}')
 
@@ -52,25 +76,13 @@ class PluginMeta(PrettySerializable):
     requirements: list = []
     description: Union[Dict[str, str], str] = ''
 
-    def search(self, keyword: str) -> bool:
-        if keyword.lower() in self.id.lower():
-            return True
-        if keyword.lower() in self.name.lower():
-            return True
-        if isinstance(self.description, dict):
-            for _, desc in self.description.items():
-                if keyword.lower() in desc.lower():
-                    return True
-        elif isinstance(self.description, str):
-            if keyword.lower() in self.description.lower():
-                return True
-        return False
-
 
 class Asset(PrettySerializable):
     name: str
+    size: Optional[int] = None
     download_count: int
     browser_download_url: str
+    hash_sha256: Optional[str] = None
 
 
 class Release(PrettySerializable):
@@ -88,29 +100,79 @@ class Release(PrettySerializable):
         return type(self.meta) == PluginMeta and self.assets
 
 
-class Plugin(PrettySerializable):
+class PluginSummary:
+    """
+    Fields of a catalogue plugin needed to browse, search and sort it.
+    """
+    __slots__ = ('id', 'name', 'version', 'repository', 'labels', 'authors', 'description')
+
+    def __init__(self, meta: dict, labels: List[str]) -> None:
+        self.id: str = sys.intern(meta.get('id') or '')
+        self.name: str = meta.get('name') or ''
+        self.version: str = meta.get('version') or ''
+        self.repository: str = meta.get('repository') or ''
+        self.labels: Tuple[str, ...] = tuple(sys.intern(label) for label in labels)
+        self.authors: Tuple[str, ...] = tuple(a.get('name', '') if isinstance(a, dict) else a for a in meta.get('authors') or ())
+        self.description: Union[Dict[str, str], str] = meta.get('description') or ''
+
+    def __repr__(self) -> str:
+        return f'PluginSummary[id={self.id!r},version={self.version!r}]'
+
+
+class Plugin:
     """
     A single MCDR plugin.
+
+    Only the summary is kept as objects. Releases are kept as compressed JSON until they're first
+    needed, e.g. by `get_release`, `info` or an installation. Then they're parsed once,
+    with their versions, and kept newest first.
     """
+    __slots__ = ('meta', 'latest', '_version', '_releases', '_release_blob')
 
     def __init__(self, plugin_json: dict, releases_json: list, meta: dict) -> None:
-        self.meta: PluginMeta = PluginMeta().deserialize(meta)
-        self.meta.labels = plugin_json['labels']
-        self.releases: List[Release] = []
-        self.latest: Version = None
-
+        self.meta = PluginSummary(meta, plugin_json['labels'])
         latest = releases_json['latest_version']
-        self.latest = Version(latest) if latest != 'N/A' else N_INF
-        releases = releases_json['releases']
-        if releases:
-            for i in releases:
-                release = Release.deserialize(i)
-                if release.validate:
-                    self.releases.append(release)
+        self.latest: Version = parse_version(latest) if latest != 'N/A' else N_INF
+        self._version: Optional[Version] = None
+        self._releases: Optional[List[Tuple[Version, Release]]] = None
+        self._release_blob = zlib.compress(
+            json.dumps(releases_json['releases'] or [], separators=(',', ':')).encode('utf8'), 1)
+
+    def parse_releases(self) -> List[Tuple[Version, Release]]:
+        """Parse valid releases from the compressed JSON, without keeping them.
+
+        Returns:
+            (version, release) pairs, newest first.
+        """
+        releases = []
+        for i in json.loads(zlib.decompress(self._release_blob)):
+            release = Release.deserialize(i)
+            if release.validate:
+                releases.append((parse_version(release.meta.version), release))
+        releases.sort(key=lambda item: item[0], reverse=True)
+        return releases
+
+    def _versioned_releases(self) -> List[Tuple[Version, Release]]:
+        if self._releases is None:
+            self._releases = self.parse_releases()
+        return self._releases
+
+    @property
+    def version(self) -> Version:
+        if self._version is None:
+            self._version = parse_version(self.meta.version)
+        return self._version
+
+    @property
+    def materialized(self) -> bool:
+        return self._releases is not None
+
+    def __repr__(self) -> str:
+        return f'Plugin[{self.meta.id}@{self.meta.version}]'
 
     def get_info_rtext(self, compared=None):
         name_rtext = RText(self.meta.name, RColor.yellow, RStyle.bold)
-        self_version = Version(self.meta.version)
+        self_version = self.version
         version_rtext = RText(self_version, RColor.green)
         title_rtext = RTextList(name_rtext, ' ', version_rtext)
         if compared:
@@ -127,37 +189,203 @@ class Plugin(PrettySerializable):
                                self.meta.description
                                if type(self.meta.description) == str
                                # !
-                               else self.meta.description.get(global_server.get_mcdr_language(), self.meta.description.get('en_us', None))
+                               else self.meta.description.get(utils.translator.language, self.meta.description.get('en_us', None))
                                )
         return info_rtext
 
-    def get_release(self, requirement: Union[VersionRequirement, str] = '*') -> List[Release]:
-        """Get latest release that matches the version requirement.
+    def get_release(self, *requirements: Union[VersionRequirement, str], excluded: Collection[str] = ()) -> Optional[Release]:
+        """Get latest release that matches all the version requirements.
 
         Args:
-            requirement (Union[VersionRequirement, str], optional): Version requiirement. Defaults to '*'.
+            requirements (Union[VersionRequirement, str]): Version requiirements. Defaults to '*'.
+            excluded (Collection[str]): Versions to skip.
+
+        Returns:
+            Release: Latest matched release, or None if there isn't one.
+        """
+        requirements = [parse_version_requirement(r) if isinstance(r, str) else r for r in requirements]
+        for version, release in self._versioned_releases():
+            if release.meta.version not in excluded and all(i.accept(version) for i in requirements):
+                return release
+        return None
+
+
+class SearchIndex:
+    """
+    Inverted index of catalogue plugins over id, name, authors, labels and descriptions.
+
+    Every field is normalised once and indexed by trigrams, so a keyword only has to be
+    checked against plugins having all of its trigrams.
+    """
+    GRAM = 3
+    WEIGHTS = {'id': 8, 'name': 6, 'authors': 3, 'labels': 2, 'description': 1}
+
+    def __init__(self, plugins: ValueDict) -> None:
+        self.plugins = plugins
+        self._fields: Dict[str, List[Tuple[int, str]]] = {}
+        self._tokens: Dict[str, set] = {}
+        self._grams: Dict[str, set] = {}
+        for plugin in plugins:
+            self._add(plugin)
+
+    @staticmethod
+    def normalise(text: str) -> str:
+        return ' '.join(str(text).lower().split())
+
+    @classmethod
+    def grams(cls, text: str) -> set:
+        return {text[i:i + cls.GRAM] for i in range(len(text) - cls.GRAM + 1)}
+
+    def _add(self, plugin: 'Plugin') -> None:
+        meta = plugin.meta
+        description = meta.description.values() if isinstance(meta.description, dict) else [meta.description]
+        authors = [a.get('name', '') if isinstance(a, dict) else a for a in meta.authors]
+        fields = [
+            ('id', [meta.id]),
+            ('name', [meta.name]),
+            ('authors', authors),
+            ('labels', meta.labels),
+            ('description', description)
+        ]
+        texts = []
+        tokens = set()
+        for field, values in fields:
+            for value in values:
+                text = self.normalise(value or '')
+                if not text:
+                    continue
+                texts.append((self.WEIGHTS[field], text))
+                tokens.update(text.split())
+                for gram in self.grams(text):
+                    self._grams.setdefault(gram, set()).add(meta.id)
+        self._fields[meta.id] = texts
+        self._tokens[meta.id] = tokens
+
+    def _score(self, plugin_id: str, keyword: str) -> int:
+        score = 0
+        for weight, text in self._fields[plugin_id]:
+            if keyword in text:
+                score += weight
+                if text == keyword:
+                    score += weight * 2
+                elif text.startswith(keyword):
+                    score += weight
+        if score and keyword in self._tokens[plugin_id]:
+            score += 1
+        return score
+
+    def search(self, keyword: str) -> List['Plugin']:
+        """Search plugins containing the keyword.
 
         Returns:
-            Release: Latest matched release.
+            List[Plugin]: Matched plugins, most relevant first.
         """
-        matched_releases = [r for r in self.releases if requirement.accept(r.meta.version)]
-        return max(matched_releases, key=lambda r: r.meta.version)
+        keyword = self.normalise(keyword)
+        if not keyword:
+            return []
+        if len(keyword) < self.GRAM:
+            candidates = self._fields.keys()
+        else:
+            postings = sorted((self._grams.get(gram, set()) for gram in self.grams(keyword)), key=len)
+            candidates = set.intersection(*postings)
+        scores = {}
+        for plugin_id in candidates:
+            score = self._score(plugin_id, keyword)
+            if score:
+                scores[plugin_id] = score
+        return [self.plugins[i] for i in sorted(scores, key=lambda i: (-scores[i], i))]
+
 
-    def search(self, keyword: str):
-        return self.meta.search(keyword)
+class IdIndex:
+    """
+    Sorted index of ids for command suggestions. Prefix lookups are two bisections, membership checks a set lookup.
+    """
+
+    def __init__(self, ids) -> None:
+        self._ids = frozenset(ids)
+        entries = sorted((i.lower(), i) for i in self._ids)
+        self._keys = [key for key, _ in entries]
+        self._values = [value for _, value in entries]
+
+    def __contains__(self, item) -> bool:
+        return item in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def prefixed(self, prefix: str) -> List[str]:
+        """Ids starting with the prefix, case-insensitive, in alphabetical order.
+        """
+        if not prefix:
+            return list(self._values)
+        prefix = prefix.lower()
+        return self._values[bisect_left(self._keys, prefix):bisect_left(self._keys, prefix + '\uffff')]
+
+
+class CatalogueGeneration:
+    """
+    One loaded catalogue with its indexes. A new generation is built for every load and published as a whole.
+    """
+
+    def __init__(self, plugins: ValueDict, fingerprints: Dict[str, str], number: int = 0) -> None:
+        self.number = number
+        self.plugins = plugins
+        self.fingerprints = fingerprints
+        self.search_index = SearchIndex(plugins)
+
+        # label -> plugin ids
+        self.labels: Dict[str, set] = {}
+        for plugin in plugins:
+            for label in plugin.meta.labels:
+                self.labels.setdefault(label, set()).add(plugin.meta.id)
+
+        # sort_by -> plugin id -> position, and sort_by -> label (None for all) -> sorted plugins
+        self.positions: Dict[str, Dict[str, int]] = {}
+        self.orderings: Dict[str, Dict[Optional[str], List[Plugin]]] = {}
+        for sort_by in SORTS:
+            ordered = sorted(plugins, key=lambda p: self.sort_key(p, sort_by))
+            self.positions[sort_by] = {p.meta.id: i for i, p in enumerate(ordered)}
+            buckets = self.orderings[sort_by] = {None: ordered}
+            for plugin in ordered:
+                for label in plugin.meta.labels:
+                    buckets.setdefault(label, []).append(plugin)
+
+    @staticmethod
+    def sort_key(plugin: Plugin, sort_by: str):
+        value = getattr(plugin.meta, sort_by)
+        if isinstance(value, (list, tuple)):
+            return [i.get('name', '') if isinstance(i, dict) else i for i in value]
+        return value
 
 
 class PluginCatalogue:
     plugins: ValueDict[str, Plugin]
 
-    def __init__(self, data_folder: str, config: Configuration, lock: Lock) -> None:
+    def __init__(self, data_folder: str, config: Configuration, lock: Lock, http: utils.HttpClient,
+                 mirrors: 'MirrorSelector') -> None:
         self.config = config
+        self.http = http
+        self.mirrors = mirrors
         self.data_folder = data_folder
         self.cache_folder = utils.touch(os.path.join(data_folder, 'cache'))
-        self.plugins = ValueDict()
+        self._generation = CatalogueGeneration(ValueDict(), {})
         self._last_check = 0
+        self._validators = None
+        # Whether the loaded catalogue is backed by a current snapshot, only then the cached validators may be sent
+        self._snapshot_loaded = False
+        self._load_lock = RLock()
         self.lock = lock
-        self.load(True)
+
+    @property
+    def plugins(self) -> ValueDict:
+        return self._generation.plugins
+
+    @property
+    def generation(self) -> int:
+        """
+        Number of the loaded catalogue generation. Changes whenever the catalogue is reloaded.
+        """
+        return self._generation.number
 
     @property
     def last_check(self):
@@ -169,44 +397,225 @@ class PluginCatalogue:
                 pass
         return self._last_check
 
+    @property
+    def validators(self) -> dict:
+        """
+        Validators of the cached catalogue (`etag`, `last_modified`), with the `source` they belong to and
+        the `revision` (time it was downloaded).
+        """
+        if self._validators is None:
+            try:
+                with open(os.path.join(self.cache_folder, 'validators.json'), 'r', encoding='utf8') as f:
+                    self._validators = json.load(f)
+            except:
+                self._validators = {}
+        return self._validators
+
+    @property
+    def revision(self) -> float:
+        return self.validators.get('revision', 0)
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        headers = {}
+        if self.validators.get('source') == self.config.source and self.validators.get('url', self.config.source) == url \
+                and self._snapshot_loaded:
+            if self.validators.get('etag'):
+                headers['If-None-Match'] = self.validators['etag']
+            if self.validators.get('last_modified'):
+                headers['If-Modified-Since'] = self.validators['last_modified']
+        return headers
+
+    def _save_validators(self, validators: dict) -> None:
+        utils.atomic_write(os.path.join(self.cache_folder, 'validators.json'), json.dumps(validators))
+        self._validators = validators
+
     @utils.check_lock
+    @utils.localized
     def _update(self, src=global_server.get_plugin_command_source()) -> None:
         """
-        Update Plugin Catalogue.
+        Update Plugin Catalogue. Skip parsing and loading if the catalogue is not modified.
+
+        The new catalogue is built off to the side and published only when it's complete,
+        so a failed update leaves both the cache and the loaded catalogue untouched.
         """
         src.reply(utils.trans('Updating catalogue...'))
+        modified = False
+        staging = os.path.join(self.cache_folder, 'staging')
+        shutil.rmtree(staging, ignore_errors=True)
         try:
-            utils.download_file(self.config.source, 'meta.zip', self.cache_folder)
-            zip = os.path.join(self.cache_folder, 'meta.zip')
-            utils.unzip(zip, self.cache_folder)  # !
+            with tempfile.SpooledTemporaryFile(CATALOGUE_SPOOL_SIZE) as buffer:
+                def download(base: str):
+                    url = self.mirrors.catalogue_url(base)
+                    buffer.seek(0)
+                    buffer.truncate()
+                    return url, self.http.download(url, buffer, self._conditional_headers(url))
+                url, response = self.mirrors.failover(download)
+                if response.status_code != 304:
+                    catalogue = self._read_meta_zip(buffer, staging if self.config.extract_catalogue else None)
+                    modified = True
+            if modified:
+                with self._load_lock:
+                    generation = self._build(catalogue)
+                    validators = {
+                        'source': self.config.source,
+                        'url': url,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'revision': time.time()
+                    }
+                    self._write_snapshot(catalogue, validators['revision'])
+                    self._snapshot_loaded = True
+                    self._save_validators(validators)
+                    meta_folder = os.path.join(self.cache_folder, 'PluginCatalogue-meta')
+                    if self.config.extract_catalogue:
+                        utils.replace_folder(os.path.join(staging, 'PluginCatalogue-meta'), meta_folder)
+                    else:
+                        shutil.rmtree(meta_folder, ignore_errors=True)
+                    self._swap(generation)
         except Exception as e:
             utils.print_msg(src, utils.trans('Catalogue update failed: {}', e), RColor.red, console=False)
             raise CatalogueUpdateError(e)
         else:
-            os.remove(zip)
-            utils.print_msg(src, utils.trans('Catalogue update §asucceed'))
+            if modified:
+                utils.print_msg(src, utils.trans('Catalogue update §asucceed'))
+            else:
+                utils.print_msg(src, utils.trans('Catalogue is already up to date'))
             self._last_check = time.time()
-            with open(os.path.join(self.cache_folder, 'last_update'), 'w', encoding='utf8') as f:
-                f.write(str(self._last_check))
+            utils.atomic_write(os.path.join(self.cache_folder, 'last_update'), str(self._last_check))
         finally:
-            self.load()
+            shutil.rmtree(staging, ignore_errors=True)
 
     @new_thread(utils.tn('Update'))
     def update(self, *args):
         self._update(*args)
 
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.cache_folder, 'catalogue.json')
+
+    @property
+    def snapshot_key(self) -> str:
+        """
+        Hash of snapshot schema and catalogue source. A snapshot with another key is stale.
+        """
+        return hashlib.sha1(f'{CATALOGUE_SNAPSHOT_VERSION}@{self.config.source}'.encode('utf8')).hexdigest()
+
+    def _read_meta_folder(self) -> Dict[str, list]:
+        """
+        Read the unzipped catalogue, three json files per plugin.
+
+        Returns:
+            A dict of plugin id -> [fingerprint, plugin.json, release.json, meta.json]
+        """
+        def read(subdir, name):
+            with open(os.path.join(subdir, name), 'rb') as f:
+                data = f.read()
+            return json.loads(data), (zlib.crc32(data), len(data))
+
+        catalogue = {}
+        meta_folder = os.path.join(self.cache_folder, 'PluginCatalogue-meta')
+        for subdir, _, _ in os.walk(meta_folder):
+            if subdir != meta_folder:
+                plugin_json, plugin_crc = read(subdir, 'plugin.json')
+                release_json, release_crc = read(subdir, 'release.json')
+                meta_json, meta_crc = read(subdir, 'meta.json')
+                fingerprint = utils.fingerprint(plugin_crc, release_crc, meta_crc)
+                catalogue[meta_json['id']] = [fingerprint, plugin_json, release_json, meta_json]
+        return catalogue
+
+    def _read_meta_zip(self, file, extract_to: Optional[str] = None) -> Dict[str, list]:
+        """
+        Read the catalogue straight from meta.zip, without extracting it to disk.
+
+        Args:
+            extract_to (str, optional): Also extract meta.zip here. For debugging.
+
+        Returns:
+            A dict of plugin id -> [fingerprint, plugin.json, release.json, meta.json]
+        """
+        def accept(info):
+            parts = info.filename.split('/')
+            return len(parts) == 3 and parts[2] in CATALOGUE_FILES
+
+        members = {}
+        for info, data in utils.read_zip(file, accept, extract_to):
+            _, plugin, name = info.filename.split('/')
+            members.setdefault(plugin, {})[name] = (json.loads(data), (info.CRC, info.file_size))
+
+        catalogue = {}
+        for files in members.values():
+            if len(files) != len(CATALOGUE_FILES):
+                continue
+            (plugin_json, plugin_crc), (release_json, release_crc), (meta_json, meta_crc) = [files[i] for i in CATALOGUE_FILES]
+            fingerprint = utils.fingerprint(plugin_crc, release_crc, meta_crc)
+            catalogue[meta_json['id']] = [fingerprint, plugin_json, release_json, meta_json]
+        return catalogue
+
+    def _read_snapshot(self) -> Optional[Dict[str, list]]:
+        """
+        Read the compiled catalogue snapshot in one go.
+
+        Returns:
+            None if the snapshot is missing, broken or stale.
+        """
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf8') as f:
+                snapshot = json.loads(f.read())
+            if snapshot['key'] != self.snapshot_key or snapshot['revision'] < self.revision:
+                return None
+            return snapshot['plugins']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_snapshot(self, catalogue: Dict[str, list], revision: float) -> None:
+        snapshot = {
+            'key': self.snapshot_key,
+            'revision': revision,
+            'plugins': catalogue
+        }
+        utils.atomic_write(self.snapshot_path, json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')))
+
+    def _build(self, catalogue: Dict[str, list]) -> CatalogueGeneration:
+        """
+        Build a new catalogue generation off to the side. Plugins whose fingerprint didn't change are reused.
+        """
+        current = self._generation
+        plugins, fingerprints = ValueDict(), {}
+        reused = 0
+        for plugin_id, (fingerprint, plugin_json, release_json, meta_json) in catalogue.items():
+            plugin = current.plugins.get(plugin_id)
+            if plugin is not None and current.fingerprints.get(plugin_id) == fingerprint:
+                reused += 1
+            else:
+                plugin = Plugin(plugin_json, release_json, meta_json)
+            plugins[plugin_id] = plugin
+            fingerprints[plugin_id] = fingerprint
+        removed = len([plugin_id for plugin_id in current.plugins.keys() if plugin_id not in plugins])
+        global_server.logger.info(utils.trans('Catalogue loaded: {} reused, {} rebuilt, {} removed',
+                                              reused, len(plugins) - reused, removed))
+        return CatalogueGeneration(plugins, fingerprints, current.number + 1)
+
+    def _swap(self, generation: CatalogueGeneration) -> None:
+        """
+        Publish a new catalogue generation. Readers holding the old one are not affected.
+        """
+        self._generation = generation
+
     def load(self, pass_exception: bool = False) -> None:
+        """
+        Load catalogue from the compiled snapshot, or compile one from the unzipped catalogue if it's missing or stale.
+        Only plugins whose fingerprint changed are deserialized again.
+        """
         try:
-            meta_folder = os.path.join(self.cache_folder, 'PluginCatalogue-meta')
-            for subdir, _, _ in os.walk(meta_folder):
-                if subdir != meta_folder:
-                    with open(os.path.join(subdir, 'plugin.json'), 'r', encoding='utf8') as f:
-                        plugin_json = json.load(f)
-                    with open(os.path.join(subdir, 'release.json'), 'r', encoding='utf8') as f:
-                        release_json = json.load(f)
-                    with open(os.path.join(subdir, 'meta.json'), 'r', encoding='utf8') as f:
-                        meta_json = json.load(f)
-                    self.plugins[meta_json['id']] = Plugin(plugin_json, release_json, meta_json)
+            with self._load_lock:
+                catalogue = self._read_snapshot()
+                self._snapshot_loaded = catalogue is not None
+                if catalogue is None:
+                    catalogue = self._read_meta_folder()
+                    if catalogue:
+                        self._write_snapshot(catalogue, self.revision)
+                        self._snapshot_loaded = True
+                self._swap(self._build(catalogue))
         except Exception as e:
             if not pass_exception:
                 raise CatalogueLoadError(e)
@@ -215,7 +624,7 @@ class PluginCatalogue:
         """Get filtered plugins.
 
         Args:
-            sort_by (str): labels / name / authors
+            sort_by (str): labels / name / authors, or None to keep search relevance order.
 
         Raises:
             ValueError: When sort_by isn't a validate sort method.
@@ -223,62 +632,625 @@ class PluginCatalogue:
         Returns:
             List[Plugin]
         """
-        plugins = self.plugins
+        generation = self._generation
+        if sort_by is not None and sort_by not in SORTS:
+            raise ValueError(utils.trans('Can\'t sort by {}', sort_by))
+
+        # intersect the id sets of all given filters
+        matched = []
         if keyword:
-            plugins = [p for p in self.plugins if p.search(keyword)]
-        if plugin_list:
-            plugins = [p for p in self.plugins if p.meta.id in plugin_list]
+            ranked = generation.search_index.search(keyword)
+            matched.append({p.meta.id for p in ranked})
+        if plugin_list is not None:
+            matched.append(set(plugin_list))
         if label:
-            plugins = [p for p in self.plugins if label in p.meta.labels]
-        if sort_by not in ['labels', 'name', 'authors']:
-            raise ValueError(utils.trans('Can\'t sort by {}', sort_by))
-        return sorted(plugins, key=lambda p: eval(f'p.meta.{sort_by}'))
+            matched.append(generation.labels.get(label, set()))
+        matched = set.intersection(*sorted(matched, key=len)) if matched else None
+
+        if sort_by is None:
+            plugins = ranked if keyword else generation.plugins
+            return [p for p in plugins if matched is None or p.meta.id in matched]
+        if matched is None:
+            return list(generation.orderings[sort_by][None])
+        if not keyword and plugin_list is None:
+            return list(generation.orderings[sort_by].get(label, []))
+        positions = generation.positions[sort_by]
+        return [generation.plugins[i] for i in sorted(matched & positions.keys(), key=positions.get)]
 
     def get(self, plugin_id, default=None) -> Plugin:
         return self.plugins.get(plugin_id, default)
 
-    def get_release(self, dependency: Dependency) -> Union[Release, None]:
+
+class MirrorSelector:
+    """
+    Picks the fastest of several GitHub mirrors, and fails over to the next one on network errors.
+
+    A mirror is a base URL standing in for `https://github.com/`, like `Configuration.source`.
+    Mirrors are ranked by fetching the first `MIRROR_PROBE_SIZE` bytes of the catalogue from each,
+    and the ranking is remembered in the cache folder for `MIRROR_PROBE_INTERVAL` seconds.
+    """
+    GITHUB = 'https://github.com/'
+
+    def __init__(self, http: utils.HttpClient, bases: List[str], cache_folder: str) -> None:
+        self.http = http
+        self.bases = list(OrderedDict.fromkeys(base if base.endswith('/') else f'{base}/' for base in bases))
+        self.path = os.path.join(cache_folder, 'mirrors.json')
+        self._lock = RLock()
+        self.ranking = list(self.bases)
+        self.probed_at = 0
+        try:
+            with open(self.path, 'r', encoding='utf8') as f:
+                cache = json.load(f)
+            if sorted(cache['ranking']) == sorted(self.bases):
+                self.ranking, self.probed_at = cache['ranking'], cache['probed_at']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.bases) > 1
+
+    @staticmethod
+    def catalogue_url(base: str) -> str:
+        # Not urljoin, which breaks prefix mirrors like https://ghproxy.com/https://github.com/
+        return base + PLUGIN_CATALOGUE
+
+    @classmethod
+    def asset_url(cls, base: str, url: str) -> str:
+        return base + url[len(cls.GITHUB):] if url.startswith(cls.GITHUB) else url
+
+    def _save(self) -> None:
+        utils.atomic_write(self.path, json.dumps({'ranking': self.ranking, 'probed_at': self.probed_at}))
+
+    def _probe(self, base: str) -> Tuple[float, float]:
         """
-        Get latest matched release from catalogue.
+        Returns:
+            Latency (time to response headers) and throughput in bytes per second.
+        """
+        start = time.perf_counter()
+        with self.http.get(self.catalogue_url(base)) as r:
+            latency = time.perf_counter() - start
+            received = 0
+            for chunk in r.iter_content(chunk_size=MIRROR_PROBE_SIZE):
+                received += len(chunk)
+                if received >= MIRROR_PROBE_SIZE:
+                    break
+        elapsed = time.perf_counter() - start
+        return latency, received / max(elapsed - latency, 1e-6)
+
+    def probe(self, src: Optional[CommandSource] = None, force: bool = False) -> None:
+        """Rank mirrors by the time to fetch the probe, which accounts for both latency and throughput.
+        Mirrors failing the probe go last.
+        """
+        if not self.enabled or (not force and time.time() - self.probed_at < MIRROR_PROBE_INTERVAL):
+            return
+        pool = ThreadPoolExecutor(len(self.bases), utils.tn('Probe'))
+        try:
+            futures = {base: pool.submit(self._probe, base) for base in self.bases}
+            results = {}
+            for base, future in futures.items():
+                try:
+                    results[base] = future.result()
+                except Exception:
+                    results[base] = None
+        finally:
+            pool.shutdown(wait=True)
+        def cost(base):
+            if results[base] is None:
+                return float('inf')
+            latency, speed = results[base]
+            return latency + MIRROR_PROBE_SIZE / speed
+        with self._lock:
+            self.ranking = sorted(self.bases, key=cost)
+            self.probed_at = time.time()
+            self._save()
+        for base in self.ranking:
+            if results[base] is None:
+                utils.print_msg(src, utils.trans('    §7{}§r unreachable', base))
+            else:
+                latency, speed = results[base]
+                utils.print_msg(src, utils.trans('    §e{}§r {:.0f} ms, {:.1f} KiB/s', base, latency * 1000, speed / 1024))
+
+    def demote(self, base: str) -> None:
+        """Move a failed mirror to the end of the ranking.
         """
-        plugin = self.get(dependency.id)
-        if plugin:
-            return plugin.get_release(dependency.version_requirement)
-        raise LookupError(utils.trans('No available release for "§e{}§r"', dependency))
+        with self._lock:
+            if base in self.ranking:
+                self.ranking.remove(base)
+                self.ranking.append(base)
+                self._save()
+
+    def failover(self, action: Callable[[str], Any], fallback: Tuple[str, ...] = ()) -> Any:
+        """Call `action` with each mirror in ranking order, then with `fallback`, until one doesn't raise a network error.
+        """
+        with self._lock:
+            candidates = list(OrderedDict.fromkeys(self.ranking + list(fallback)))
+        error = None
+        for base in candidates:
+            try:
+                return action(base)
+            except NetworkError as e:
+                error = e
+                self.demote(base)
+                if base != candidates[-1]:
+                    global_server.logger.warning(utils.trans('{} failed, switching to next mirror: {}', base, e))
+        raise error
+
+
+class AssetCache:
+    """
+    Content-addressed cache of downloaded plugin assets. Index reads and changes hold a lock file,
+    and the index is re-read under it, so several MCDR instances can share one cache folder.
+
+    Files are stored by SHA-256 under `objects/`, and `index.json` maps `<id>@<version>/<asset name>`
+    to the digest, size and last use time. The least recently used files are evicted once the cache
+    grows over `max_size` bytes.
+    """
+
+    def __init__(self, folder: str, max_size: int) -> None:
+        self.folder = utils.touch(folder)
+        self.objects_folder = utils.touch(os.path.join(folder, 'objects'))
+        self.index_path = os.path.join(folder, 'index.json')
+        self.max_size = max_size
+        self._lock = utils.FileLock(os.path.join(folder, 'index.lock'))
+        with self._lock:
+            self._entries: Dict[str, dict] = self._read_index()
+
+    @staticmethod
+    def key(plugin_id: str, version: str, asset: Asset) -> str:
+        return f'{plugin_id}@{version}/{asset.name}'
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            self._entries = self._read_index()
+            return sum(entry['size'] for entry in self._unique_objects().values())
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_folder, digest)
+
+    def _unique_objects(self) -> Dict[str, dict]:
+        # Different keys may share one object, which was last used by the most recent of them
+        objects = {}
+        for entry in self._entries.values():
+            current = objects.get(entry['sha256'])
+            if current is None or entry['used_at'] > current['used_at']:
+                objects[entry['sha256']] = entry
+        return objects
+
+    def _read_index(self) -> Dict[str, dict]:
+        try:
+            with open(self.index_path, 'r', encoding='utf8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self) -> None:
+        utils.atomic_write(self.index_path, json.dumps(self._entries))
+
+    def get(self, plugin_id: str, version: str, asset: Asset, folder: str) -> Optional[str]:
+        """Copy a cached asset into `folder`.
+
+        Returns:
+            Path of the copied file, or None on a cache miss or a corrupted cache file.
+        """
+        if not self.enabled:
+            return None
+        key = self.key(plugin_id, version, asset)
+        with self._lock:
+            self._entries = self._read_index()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            digest = entry['sha256']
+            source = self._object_path(digest)
+            if (asset.hash_sha256 and asset.hash_sha256.lower() != digest) or \
+                    not os.path.isfile(source) or utils.file_sha256(source) != digest:
+                del self._entries[key]
+                self._release({digest})
+                self._save_index()
+                return None
+            entry['used_at'] = time.time()
+            path = os.path.join(folder, asset.name)
+            shutil.copyfile(source, path)
+            self._save_index()
+            return path
+
+    def put(self, plugin_id: str, version: str, asset: Asset, file: str) -> None:
+        """Add a downloaded asset to the cache, then evict files over the size limit.
+        """
+        if not self.enabled:
+            return
+        digest = utils.file_sha256(file)
+        if asset.hash_sha256 and asset.hash_sha256.lower() != digest:
+            return
+        with self._lock:
+            self._entries = self._read_index()
+            target = self._object_path(digest)
+            if not os.path.isfile(target):
+                fd, temp = tempfile.mkstemp('.tmp', dir=self.objects_folder)
+                os.close(fd)
+                shutil.copyfile(file, temp)
+                os.replace(temp, target)
+            self._entries[self.key(plugin_id, version, asset)] = {
+                'sha256': digest, 'size': os.path.getsize(target), 'used_at': time.time()
+            }
+            self._evict(self.max_size)
+            self._save_index()
+
+    def _evict(self, max_size: int) -> Tuple[int, int]:
+        objects = sorted(self._unique_objects().values(), key=lambda entry: entry['used_at'])
+        total = sum(entry['size'] for entry in objects)
+        evicted = set()
+        for entry in objects:
+            if total <= max_size:
+                break
+            evicted.add(entry['sha256'])
+            total -= entry['size']
+        keys = [key for key, entry in self._entries.items() if entry['sha256'] in evicted]
+        freed = sum(entry['size'] for entry in objects if entry['sha256'] in evicted)
+        for key in keys:
+            del self._entries[key]
+        self._release(evicted)
+        return len(keys), freed
+
+    def _release(self, digests: set) -> None:
+        """Remove files of `digests` that no entry refers to anymore.
+        """
+        referenced = {entry['sha256'] for entry in self._entries.values()}
+        for digest in digests - referenced:
+            path = self._object_path(digest)
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def _sweep(self) -> int:
+        """Remove files under `objects/` that no entry refers to, e.g. left by a crashed instance.
+
+        Returns:
+            Freed bytes.
+        """
+        referenced = {entry['sha256'] for entry in self._entries.values()}
+        freed = 0
+        for name in os.listdir(self.objects_folder):
+            path = self._object_path(name)
+            if name not in referenced and os.path.isfile(path):
+                freed += os.path.getsize(path)
+                os.remove(path)
+        return freed
+
+    def prune(self, max_size: int = 0) -> Tuple[int, int]:
+        """Evict least recently used files until the cache fits in `max_size` bytes, and remove unreferenced files.
+
+        Returns:
+            Number of evicted entries and freed bytes.
+        """
+        with self._lock:
+            self._entries = self._read_index()
+            count, freed = self._evict(max_size)
+            self._save_index()
+            return count, freed + self._sweep()
+
+    def entries(self) -> List[Tuple[str, dict]]:
+        """Cached entries, most recently used first.
+        """
+        with self._lock:
+            self._entries = self._read_index()
+            return sorted(self._entries.items(), key=lambda item: item[1]['used_at'], reverse=True)
+
+
+class InstallStep:
+    """
+    A plugin release to install in an install plan.
+    """
+
+    def __init__(self, dependency: Dependency, release: Release, is_dependency: bool, is_upgrade: bool) -> None:
+        self.dependency = dependency
+        self.release = release
+        self.is_dependency = is_dependency
+        self.is_upgrade = is_upgrade
+
+    @property
+    def id(self) -> str:
+        return self.dependency.id
+
+    def __repr__(self):
+        return f'{self.id}@{self.release.meta.version}'
+
+
+class InstallPlan:
+    """
+    Result of dependency resolving. Steps are in install order, dependencies first.
+    """
+
+    def __init__(self, steps: List[InstallStep], satisfied: List[Dependency]) -> None:
+        self.steps = steps
+        self.satisfied = satisfied
+
+    @property
+    def requirements(self) -> List[str]:
+        """
+        Python requirements of all releases to install, without duplicates.
+        """
+        requirements = []
+        for step in self.steps:
+            for requirement in step.release.meta.requirements:
+                if requirement not in requirements:
+                    requirements.append(requirement)
+        return requirements
+
+    def describe(self) -> List[str]:
+        lines = []
+        for step in self.steps:
+            action = utils.trans('§lUpgrading§r') if step.is_upgrade else utils.trans('§lInstalling§r')
+            item = utils.trans('dependency') if step.is_dependency else utils.trans('plugin')
+            lines.append(f'  {action} {item} §e{step}§r')
+        return lines
+
+    def __bool__(self):
+        return bool(self.steps)
+
+    def __repr__(self):
+        return ', '.join(map(repr, self.steps))
+
+
+class DependencyResolver:
+    """
+    Resolve the whole dependency graph from catalogue before anything is installed.
+
+    Every plugin gets the latest release accepting all requirements on it. An installed plugin is kept if it
+    accepts them and is not outdated. On a conflict, older releases of the plugins introducing it are tried,
+    up to `RESOLVE_ATTEMPTS` times. Unresolved conflicts and circular dependencies are reported up front.
+    """
+
+    def __init__(self, catalogue: PluginCatalogue, installed: ValueDict, outdated: frozenset) -> None:
+        self.catalogue = catalogue
+        self.installed = installed
+        self.outdated = outdated
+
+    def _installed_version(self, plugin_id: str) -> Optional[Version]:
+        if plugin_id == 'python':
+            return parse_version(platform.python_version())
+        plugin: Metadata = self.installed.get(plugin_id)
+        return plugin.version if plugin else None
+
+    def _constraints(self, dependencies: List[Dependency], chosen: Dict[str, Optional[Release]]) -> Dict[str, list]:
+        """
+        Requirements on every plugin, from requested dependencies and from dependencies of chosen releases.
+
+        Returns:
+            A dict of plugin id -> [(Dependency, required by plugin id or None)]
+        """
+        constraints = {}
+        for dependency in dependencies:
+            constraints.setdefault(dependency.id, []).append((dependency, None))
+        for plugin_id, release in chosen.items():
+            if release is None:
+                continue
+            for dependency_id, requirement in release.meta.dependencies.items():
+                constraints.setdefault(dependency_id, []).append((Dependency(dependency_id, requirement), plugin_id))
+        return constraints
+
+    def _choose(self, plugin_id: str, constraints: list, excluded: Collection[str] = ()) -> Optional[Release]:
+        """
+        Choose a release for the plugin, or None to keep the installed one. Releases of `excluded` versions are skipped.
+        """
+        requirements = [d.version_requirement for d, _ in constraints]
+        installed = self._installed_version(plugin_id)
+        satisfied = installed is not None and all(r.accept(installed) for r in requirements)
+        if plugin_id in DEPENDENCY_BLACKLIST:
+            if not satisfied:
+                raise SpecialRequirementError(utils.trans(
+                    '§cAluminum can\'t install §6{}§c automatically. You may install it yourself.', constraints[0][0]))
+            return None
+        if satisfied and plugin_id not in self.outdated:
+            return None
+        plugin = self.catalogue.get(plugin_id)
+        if not plugin:
+            raise LookupError(utils.trans('No available release for "§e{}§r"', constraints[0][0]))
+        release = plugin.get_release(*requirements, excluded=excluded)
+        if not release:
+            required = ', '.join(f'{d.version_requirement} ({by or utils.trans("requested")})' for d, by in constraints)
+            raise DependencyConflictError(utils.trans('No release of §e{}§r satisfies {}', plugin_id, required))
+        return release
+
+    def _order(self, chosen: Dict[str, Release]) -> List[str]:
+        """
+        Sort plugins to install topologically, dependencies first.
+        """
+        requires = {i: {d for d in r.meta.dependencies if d in chosen} for i, r in chosen.items()}
+        ordered = []
+        while requires:
+            ready = sorted(i for i, deps in requires.items() if not deps)
+            if not ready:
+                raise DependencyCycleError(utils.trans('Circular dependency among §e{}§r', ', '.join(sorted(requires))))
+            for plugin_id in ready:
+                requires.pop(plugin_id)
+                ordered.append(plugin_id)
+            for deps in requires.values():
+                deps.difference_update(ready)
+        return ordered
+
+    def _settle(self, dependencies: List[Dependency], excluded: Dict[str, frozenset]) -> Tuple[dict, dict]:
+        """
+        Choose releases until no choice changes.
+
+        Returns:
+            Chosen releases (None for kept ones) and constraints of every plugin
+        """
+        chosen: Dict[str, Optional[Release]] = {}
+        for _ in range(RESOLVE_ROUNDS):
+            constraints = self._constraints(dependencies, chosen)
+            picked = {}
+            for plugin_id, constraint in constraints.items():
+                try:
+                    picked[plugin_id] = self._choose(plugin_id, constraint, excluded.get(plugin_id, ()))
+                except DependencyConflictError as e:
+                    e.culprits = tuple((by, chosen[by].meta.version) for _, by in constraint if by is not None)
+                    raise
+            if picked == chosen:
+                return chosen, constraints
+            chosen = picked
+        raise DependencyConflictError(utils.trans('Dependencies of {} can\'t be resolved', dependencies))
+
+    def resolve(self, dependencies: List[Dependency]) -> InstallPlan:
+        """Resolve requested dependencies into an install plan.
+
+        Releases are searched depth first: on a conflict, each chosen release requiring the conflicting plugin
+        is excluded in turn, so its next older release is tried.
+
+        Raises:
+            DependencyResolveError: Conflicting requirements or circular dependencies.
+            SpecialRequirementError: A python / mcdreforged requirement isn't satisfied.
+            LookupError: A plugin is not in catalogue.
+        """
+        pending = [{}]
+        tried = set()
+        error = None
+        while pending and len(tried) < RESOLVE_ATTEMPTS:
+            excluded = pending.pop()
+            state = frozenset(excluded.items())
+            if state in tried:
+                continue
+            tried.add(state)
+            try:
+                chosen, constraints = self._settle(dependencies, excluded)
+                break
+            except DependencyConflictError as e:
+                # Report the conflict among latest releases if nothing works
+                error = error or e
+                for plugin_id, version in reversed(e.culprits):
+                    pending.append({**excluded, plugin_id: excluded.get(plugin_id, frozenset()) | {version}})
+        else:
+            raise error
+
+        roots = {d.id for d in dependencies}
+        to_install = {i: r for i, r in chosen.items() if r is not None}
+        steps = [InstallStep(constraints[i][0][0], to_install[i], i not in roots, i in self.installed)
+                 for i in self._order(to_install)]
+        satisfied = [constraints[i][0][0] for i, r in chosen.items() if r is None and i not in DEPENDENCY_BLACKLIST]
+        return InstallPlan(steps, satisfied)
 
 
 class PluginManager:
     catalogue: PluginCatalogue
     _plugins: ValueDict[Metadata]
 
-    def __init__(self, config: Configuration, lock: Lock) -> None:
+    def __init__(self, config: Configuration, lock: Lock, http: utils.HttpClient, mirrors: MirrorSelector) -> None:
         if config.plugin_folder not in global_server.get_mcdr_config()['plugin_directories']:
             raise PluginFolderError(utils.trans('{} is not a MCDR plugin dictionary', config.plugin_folder))
         self.config = config
-        self._plugins = ValueDict(global_server.get_all_metadata())
-        self.catalogue = PluginCatalogue(global_server.get_data_folder(), config, lock)
+        self.http = http
+        self.mirrors = mirrors
+        self.distributions = utils.RequirementChecker()
+        self.downloads_folder = utils.touch(os.path.join(global_server.get_data_folder(), 'downloads'))
+        self.assets = AssetCache(config.asset_cache_folder or os.path.join(global_server.get_data_folder(), 'assets'),
+                                 config.asset_cache_size * 1024 * 1024)
+        self._plugins = ValueDict()
+        self._versions: Dict[str, str] = {}
+        self._installed_version = 0
+        self._refreshed_at = None
+        self._snapshot_lock = RLock()
+        self._changed: set = set()
+        self._outdated: frozenset = frozenset()
+        self._outdated_state = None
+        self._views = OrderedDict()
+        self._views_state = None
+        self._views_lock = Lock()
+        self._rendered = OrderedDict()
+        self._rendered_state = None
+        self._rendered_lock = Lock()
+        self._id_indexes: Dict[str, Tuple[Any, IdIndex]] = {}
+        self._id_indexes_lock = Lock()
+        self.catalogue = PluginCatalogue(global_server.get_data_folder(), config, lock, http, mirrors)
         self.lock = lock
         self.scheduler = utils.TaskScheduler(config.update_interval, self.check_update,
                                              utils.tn('AutoUpdate'),
                                              arguments=(global_server.get_plugin_command_source(), True,))
+        self.ready = Event()
+
+    @new_thread(utils.tn('WarmUp'))
+    def warm_up(self):
+        """
+        Load the translation and the catalogue cache, take the installed plugin snapshot,
+        then start automatic updates. Runs off the loading thread, so MCDR isn't blocked meanwhile.
+        """
+        start = time.perf_counter()
+        try:
+            utils.translator.load()
+            self.catalogue.load(True)
+            self.update()
+        finally:
+            self.ready.set()
+        global_server.logger.info(utils.trans('Warmed up in {:.1f} ms', (time.perf_counter() - start) * 1000))
         self.scheduler.start()
-        # self.check_update(global_server.get_plugin_command_source())
 
-    def update(self):
-        self._plugins = ValueDict(global_server.get_all_metadata())
+    def update(self, force: bool = False):
+        """
+        Refresh the installed plugin snapshot if it's invalidated or older than `INSTALLED_SNAPSHOT_TTL` seconds.
+        The snapshot is replaced, and `installed_version` bumped, only when plugin ids or versions changed.
+        """
+        with self._snapshot_lock:
+            now = time.monotonic()
+            if not force and self._refreshed_at is not None and now - self._refreshed_at < INSTALLED_SNAPSHOT_TTL:
+                return
+            metadata = global_server.get_all_metadata()
+            versions = {k: str(v.version) for k, v in metadata.items()}
+            if versions != self._versions:
+                self._changed.update(k for k in versions.keys() | self._versions.keys()
+                                     if versions.get(k) != self._versions.get(k))
+                self._plugins = ValueDict(metadata)
+                self._versions = versions
+                self._installed_version += 1
+            self._refreshed_at = now
+
+    def invalidate(self):
+        """
+        Mark the installed plugin snapshot as outdated, e.g. after loading or disabling a plugin.
+        """
+        self._refreshed_at = None
 
     @property
-    def outdated_plugins(self) -> List[str]:
-        return self._check_upgrade(None)
+    def installed_version(self) -> int:
+        """
+        Version of the installed plugin snapshot. Changes whenever installed plugins change.
+        """
+        self.update()
+        return self._installed_version
+
+    def _is_outdated(self, plugin_id: str) -> bool:
+        plugin: Metadata = self._plugins.get(plugin_id)
+        online_plugin = self.catalogue.get(plugin_id, None)
+        return bool(plugin and online_plugin and online_plugin.latest > plugin.version)
+
+    @property
+    def outdated_plugins(self) -> frozenset:
+        """
+        Ids of installed plugins with a newer release in catalogue.
+
+        Computed once per catalogue generation, and only re-checked for changed plugins when installed plugins change.
+        """
+        with self._snapshot_lock:
+            state = (self.catalogue.generation, self.installed_version)
+            if self._outdated_state is None or self._outdated_state[0] != state[0]:
+                self._outdated = frozenset(i for i in self._plugins.keys() if self._is_outdated(i))
+            elif self._outdated_state != state:
+                outdated = set(self._outdated)
+                for plugin_id in self._changed:
+                    if self._is_outdated(plugin_id):
+                        outdated.add(plugin_id)
+                    else:
+                        outdated.discard(plugin_id)
+                self._outdated = frozenset(outdated)
+            self._changed.clear()
+            self._outdated_state = state
+            return self._outdated
 
     def _check_upgrade(self, src=None) -> List[str]:
-        outdated_plugins = []
-        for plugin in self.plugins:
-            plugin: Metadata
-            online_plugin = self.catalogue.get(plugin.id, None)
-            if online_plugin:
-                if online_plugin.latest > plugin.version:
-                    outdated_plugins.append(plugin.id)
+        outdated_plugins = sorted(self.outdated_plugins)
         if outdated_plugins:
             command = f'{PREFIX[0]} browse outdated'
             utils.print_msg(src, RTextBase.format(utils.trans('§e{} outdated plugins§r detected. Use §3{} §rfor more infimation.'), str(
@@ -294,6 +1266,7 @@ class PluginManager:
 
     @utils.check_lock
     @new_thread(utils.tn('UpdateCheck'))
+    @utils.localized
     def check_update(self, src: CommandSource, is_autoupdate: bool = False, check_upgrade: bool = None):
         if check_upgrade is None:
             check_upgrade = self.config.check_upgrade
@@ -301,6 +1274,9 @@ class PluginManager:
             utils.print_msg(src, utils.trans('Automatic catalogue update started'))
         if time.time() - self.catalogue.last_check >= self.config.update_interval:
             #! TODO: refactor to PluginCatalogue, take class Session out alone
+            if self.mirrors.enabled and time.time() - self.mirrors.probed_at >= MIRROR_PROBE_INTERVAL:
+                utils.print_msg(src, utils.trans('Probing mirrors...'))
+                self.mirrors.probe(src)
             self.catalogue._update(src)
         if check_upgrade:
             self._check_upgrade(src)
@@ -310,109 +1286,269 @@ class PluginManager:
         self.update()
         return self._plugins
 
-    def requires(self, dependency: Dependency):
-        plugin: Metadata = self.plugins.get(dependency.id)
-        if plugin:
-            if dependency.version_requirement.accept(plugin.version):
-                return True
-        return False
+    def id_index(self, kind: str) -> IdIndex:
+        """
+        Get the id index of a kind: catalogue, installed, known (both), outdated, disabled or unloaded (plugin files).
+        Indexes are rebuilt only when the catalogue or installed plugins change, plugin files also when the installed
+        plugin snapshot is refreshed.
+        """
+        state = (self.catalogue.generation, self.installed_version)
+        if kind in ('disabled', 'unloaded'):
+            state += (self._refreshed_at,)
+        with self._id_indexes_lock:
+            cached = self._id_indexes.get(kind)
+            if cached is not None and cached[0] == state:
+                return cached[1]
+
+        if kind == 'catalogue':
+            ids = self.catalogue.plugins.keys()
+        elif kind == 'installed':
+            ids = self._plugins.keys()
+        elif kind == 'known':
+            ids = self._plugins.keys() | self.catalogue.plugins.keys()
+        elif kind == 'outdated':
+            ids = self.outdated_plugins
+        elif kind == 'disabled':
+            ids = map(os.path.basename, global_server.get_disabled_plugin_list())
+        elif kind == 'unloaded':
+            ids = map(os.path.basename, global_server.get_unloaded_plugin_list())
+        else:
+            raise ValueError(kind)
+        index = IdIndex(ids)
+        with self._id_indexes_lock:
+            self._id_indexes[kind] = (state, index)
+        return index
 
-    def __pip_install(self, src, module):
+    def suggest(self, kind: str, ctx: dict, argument: str) -> List[str]:
+        """
+        Suggest ids of an id index matching the typed prefix of `argument`.
+        For a multi-id argument only the last id is completed, the ones before it are kept.
+        """
+        typed = ctx.get(argument, '')
+        head, _, prefix = typed.rpartition(' ')
+        matches = self.id_index(kind).prefixed(prefix)
+        if head:
+            return [f'{head} {i}' for i in matches]
+        return matches
+
+    def __pip_install(self, src, requirements: List[str]):
+        """Install missing python requirements with a single pip invocation.
+
+        All requirements are checked against the installed environment first, then the missing ones
+        are installed together, with `Configuration.pip_constraints` as the constraints file if set.
+        """
+        if not requirements:
+            return
+        missing = []
         try:
-            try:
-                pkg_resources.require(module)
-                if re.match(r'^(\w+)', module).group(1) not in DEPENDENCY_BLACKLIST:
-                    utils.print_msg(src, utils.trans('Requirement "§e{}§r" §aalready satisfied', module))
-            except (pkg_resources.DistributionNotFound):
-                utils.print_msg(src, utils.trans('Installing requirement "§e{}§r"', module))
-                subprocess.check_call([PYTHON, '-m', 'pip',
-                                      '--disable-pip-version-check', 'install', module, '-q'])
-                utils.print_msg(src, utils.trans('Module "§6{}§r" §linstalled§r §asuccessfully§r', module))
-            except pkg_resources.VersionConflict:
-                utils.print_msg(src, utils.trans(
-                    'Detected version conflict of required module {}. Please resolve it yourself to prevent errors with other plugins.', module))
-                raise
+            for module in requirements:
+                state, version = self.distributions.check(module)
+                if state == utils.RequirementChecker.SATISFIED:
+                    if re.match(r'^(\w+)', module).group(1) not in DEPENDENCY_BLACKLIST:
+                        utils.print_msg(src, utils.trans('Requirement "§e{}§r" §aalready satisfied', module))
+                elif state == utils.RequirementChecker.MISSING:
+                    missing.append(module)
+                else:
+                    utils.print_msg(src, utils.trans(
+                        'Detected version conflict of required module {}. Please resolve it yourself to prevent errors with other plugins.', module))
+                    raise RequirementInstallError(utils.trans('{} is required, but {} is installed', module, version))
+        except RequirementInstallError:
+            raise
         except Exception as e:
             raise RequirementInstallError(e)
+        if not missing:
+            return
 
-    def __perform_install(self, src: CommandSource, dependency: Dependency, release: Release, is_dependency: Optional[bool] = False, is_upgrade: Optional[bool] = False, plugin_folder: Optional[str] = PLUGIN_FOLDER):
-        """Install a plugin from catalogue.
+        utils.print_msg(src, utils.trans('Installing {} requirement(s): §e{}§r', len(missing), ', '.join(missing)))
+        command = [PYTHON, '-m', 'pip', '--disable-pip-version-check', 'install', '-q', *missing]
+        if self.config.pip_constraints:
+            command += ['-c', self.config.pip_constraints]
+        result = subprocess.run(command, capture_output=True, text=True)
+
+        # pip either installs everything or nothing, but check each one to report them properly
+        self.distributions.invalidate()
+        failed = []
+        for module in missing:
+            if self.distributions.check(module)[0] == utils.RequirementChecker.SATISFIED:
+                utils.print_msg(src, utils.trans('Module "§6{}§r" §linstalled§r §asuccessfully§r', module))
+            else:
+                failed.append(module)
+                utils.print_msg(src, utils.trans('§cFail§r to §linstall§r requirement §6{}§r', module), RColor.red)
+        if result.returncode != 0 or failed:
+            error = result.stderr.strip().splitlines()
+            raise RequirementInstallError(error[-1] if error else ', '.join(failed))
+
+    def __perform_install(self, src: CommandSource, plan: InstallPlan, plugin_folder: Optional[str] = PLUGIN_FOLDER):
+        """Install plugins of an install plan in order.
 
         Args:
-            dependency_spec (str): `plugin_id>=1.0.0` or `plugin_id` for example.
-            is_dependency (bool, optional): Install as a dependency for another plugin. Defaults to False.
+            plan (InstallPlan): Resolved install plan.
         """
-        #! Todo: Multi plugins install
+        step = None
+        staging = tempfile.mkdtemp(dir=utils.touch(os.path.join(global_server.get_data_folder(), 'staging')))
         try:
-            action = utils.trans('§lUpgrading§r') if is_upgrade else utils.trans('§lInstalling§r')
-            item = utils.trans('dependency') if is_dependency else utils.trans('plugin')
-            msg = f'{action} {item}: "§e{dependency}§r"'
-            utils.print_msg(src, msg)
+            self.__pip_install(src, plan.requirements)
 
-            dependencies = release.meta.dependencies
-            for d in dependencies:
-                try:
-                    self._install(src, d, dependencies[d], is_dependency=True, install_method=self.__perform_install)
-                except Exception as e:
-                    raise DependencyInstallError(e)
-            for r in release.meta.requirements:
-                self.__pip_install(src, r)
+            files = self._download_assets(src, plan, staging)
 
-            if len(release.assets) > 1:
-                #! TODO: support multi assets
-                pass
-            asset = release.assets[0]
-            utils.download_file(asset.browser_download_url, asset.name, plugin_folder)
-            #! TODO: support ghproxy, fastgit, etc.
+            for step in plan.steps:
+                action = utils.trans('§lUpgrading§r') if step.is_upgrade else utils.trans('§lInstalling§r')
+                item = utils.trans('dependency') if step.is_dependency else utils.trans('plugin')
+                msg = f'{action} {item}: "§e{step.dependency}§r"'
+                utils.print_msg(src, msg)
 
-            if is_upgrade:
-                self._disable(dependency.id)
+                release = step.release
+                if step.is_upgrade:
+                    self._disable(step.id)
 
-            if global_server.load_plugin(os.path.join(plugin_folder, asset.name)):
+                path = shutil.move(files[step.id], os.path.join(plugin_folder, os.path.basename(files[step.id])))
+                loaded = global_server.load_plugin(path)
+                self.invalidate()
+                if not loaded:
+                    raise DependencyInstallError(utils.trans('Failed to load {}', os.path.basename(path)))
                 utils.print_msg(src, utils.trans('Plugin "§e{}@{}§r" §linstalled§r §asuccessfully§r',
-                                dependency.id, release.meta.version))
-        except DependencyInstallError as e:
-            error = utils.trans('§cFail§r to §linstall§r dependency §e{}§r', dependency)
-            utils.print_msg(src, f"{error}: {e}", RColor.red, False)
-            raise  # ! TODO: logger.debug instead of raise
+                                step.id, release.meta.version))
         except RequirementInstallError as e:
-            error = utils.trans('§cFail§r to §linstall§r requirement §6{}§r', dependency)
+            error = utils.trans('§cFail§r to §linstall§r requirement §6{}§r', plan)
             utils.print_msg(src, f"{error}: {e}", RColor.red, False)
             raise
         except Exception as e:
-            error = utils.trans('§cFail§r to §linstall§r {}', dependency if dependency else dependency)
+            if step and step.is_dependency:
+                error = utils.trans('§cFail§r to §linstall§r dependency §e{}§r', step.dependency)
+            else:
+                error = utils.trans('§cFail§r to §linstall§r {}', step.dependency if step else plan)
             utils.print_msg(src, f"{error}: {e}", RColor.red, False)
             raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
 
-    @execute_on_second_time(10, utils.trans('installing or upgrading'), f'{PREFIX[0]} install {{}}')
-    def __confirm_and_install(self, *a, **kw):
-        self.__perform_install(*a, **kw)
+    def _download_assets(self, src: CommandSource, plan: InstallPlan, staging: str) -> Dict[str, str]:
+        """Download assets of all plugins in an install plan concurrently.
 
-    def _install(self, src: CommandSource, dependency_spec: str, version_requirement: Optional[Union[str, VersionRequirement]] = None, is_dependency: Optional[bool] = False, plugin_folder: Optional[str] = PLUGIN_FOLDER, install_method: callable = __perform_install):
+        Returns:
+            A dict of plugin id -> downloaded file
+        """
+        def download(step: InstallStep):
+            asset, folder = prepare(step)
+            version = step.release.meta.version
+            # Keep partial files out of the staging folder, so a failed install can resume them
+            part = os.path.join(self.downloads_folder, f'{step.id}-{version}-{asset.name}.part')
+            self.mirrors.failover(
+                lambda base: self.http.download_file(self.mirrors.asset_url(base, asset.browser_download_url), asset.name,
+                                                     folder, size=asset.size, sha256=asset.hash_sha256, part=part),
+                fallback=(MirrorSelector.GITHUB,))
+            path = os.path.join(folder, asset.name)
+            self.assets.put(step.id, version, asset, path)
+            return path
+
+        def prepare(step: InstallStep) -> Tuple[Asset, str]:
+            if len(step.release.assets) > 1:
+                #! TODO: support multi assets
+                pass
+            return step.release.assets[0], utils.touch(os.path.join(staging, step.id))
+
+        files = {}
+        for step in plan.steps:
+            asset, folder = prepare(step)
+            cached = self.assets.get(step.id, step.release.meta.version, asset, folder)
+            if cached:
+                files[step.id] = cached
+        if files:
+            utils.print_msg(src, utils.trans('Using {} cached plugin(s)', len(files)))
+        missing = [step for step in plan.steps if step.id not in files]
+        if not missing:
+            return files
+        utils.print_msg(src, utils.trans('Downloading {} plugin(s)...', len(missing)))
+        pool = ThreadPoolExecutor(max(1, self.config.download_threads), utils.tn('Download'))
+        futures = {}
         try:
-            dependency = Dependency(dependency_spec, version_requirement)
-            if dependency.id in DEPENDENCY_BLACKLIST:
-                if not self.requires(dependency):
-                    raise SpecialRequirementError(utils.trans(
-                        '§cAluminum can\'t install §6{}§c automatically. You may install it yourself.'), dependency)
-                return
-            else:
-                if self.requires(dependency) and dependency.id not in list(self.outdated_plugins):
-                    utils.print_msg(src, utils.trans('Dependency "§e{}§r" §aalready satisfied', dependency))
-                    return
+            for step in missing:
+                futures[step.id] = pool.submit(download, step)
+            files.update({plugin_id: future.result() for plugin_id, future in futures.items()})
+            return files
+        finally:
+            # Don't start queued downloads after a failure
+            for future in futures.values():
+                future.cancel()
+            pool.shutdown(wait=True)
+
+    @utils.check_lock
+    @utils.localized
+    def show_cache(self, src: CommandSource):
+        entries = self.assets.entries()
+        utils.print_msg(src, utils.trans('§lAsset cache§r: {} file(s), {:.1f} / {} MiB',
+                                         len(entries), self.assets.size / 1024 / 1024, self.config.asset_cache_size))
+        for key, entry in entries:
+            src.reply(f'    §e{key}§r {entry["size"] / 1024:.1f} KiB')
+
+    @utils.check_lock
+    @utils.localized
+    def prune_cache(self, src: CommandSource):
+        count, freed = self.assets.prune()
+        utils.print_msg(src, utils.trans('Removed {} cached file(s), {:.1f} MiB freed', count, freed / 1024 / 1024))
+
+    @execute_on_second_time(10, 'installing or upgrading', f'{PREFIX[0]} install {{}}',
+                            describe=lambda spec, plan, *args: plan.describe())
+    def __confirm_and_install(self, src, spec, plan, *args):
+        self.__perform_install(src, plan, *args)
+
+    @execute_on_second_time(10, 'upgrading', f'{PREFIX[0]} upgrade {{}}',
+                            describe=lambda spec, plan, *args: plan.describe())
+    def __confirm_and_upgrade(self, src, spec, plan, *args):
+        self.__perform_install(src, plan, *args)
+
+    def resolve(self, dependencies: List[Dependency]) -> InstallPlan:
+        """
+        Resolve dependencies into an install plan against the catalogue and installed plugins.
+        """
+        return DependencyResolver(self.catalogue, self.plugins, self.outdated_plugins).resolve(dependencies)
 
-            is_upgrade = dependency.id in self.plugins
-            release = self.catalogue.get_release(dependency)
+    def _install(self, src: CommandSource, dependency_specs: Union[str, List[str]], plugin_folder: Optional[str] = PLUGIN_FOLDER, install_method: callable = None, command_arg: Optional[str] = None):
+        """Resolve plugins together and install them as one plan.
+
+        Args:
+            dependency_specs (str | List[str]): `plugin_id>=1.0.0` or `plugin_id` for example.
+            install_method (callable, optional): Called with (src, command_arg, plan, plugin_folder) instead of installing directly.
+            command_arg (str, optional): Argument to repeat the command with. Defaults to the joined specs.
+        """
+        if isinstance(dependency_specs, str):
+            dependency_specs = [dependency_specs]
+        try:
+            plan = self.resolve([Dependency(spec) for spec in dependency_specs])
+            for satisfied in plan.satisfied:
+                utils.print_msg(src, utils.trans('Dependency "§e{}§r" §aalready satisfied', satisfied))
         except Exception as e:
             utils.print_msg(src, f'§c{e}')
             raise  # !
         else:
-            install_method(src, dependency, release, is_dependency, is_upgrade, plugin_folder)
+            if plan:
+                if install_method:
+                    install_method(src, command_arg or ' '.join(dependency_specs), plan, plugin_folder)
+                else:
+                    self.__perform_install(src, plan, plugin_folder)
 
     @new_thread(utils.tn('Install'))
     @utils.check_lock
-    def install(self, *args, **kwargs):
-        self._install(*args, **kwargs, install_method=self.__confirm_and_install)
+    @utils.localized
+    def install(self, src: CommandSource, plugin_ids: str, **kwargs):
+        self._install(src, plugin_ids.split(), **kwargs, install_method=self.__confirm_and_install)
+
+    @new_thread(utils.tn('Upgrade'))
+    @utils.check_lock
+    @utils.localized
+    def upgrade(self, src: CommandSource, plugin_ids: Optional[str] = None, **kwargs):
+        """
+        Upgrade given plugins, or all outdated plugins if `plugin_ids` is None.
+        """
+        if plugin_ids is None:
+            dependency_specs = sorted(self.outdated_plugins)
+            if not dependency_specs:
+                utils.print_msg(src, utils.trans('Your plugins are all latest!'), RColor.green)
+                return
+        else:
+            dependency_specs = plugin_ids.split()
+        self._install(src, dependency_specs, **kwargs, install_method=self.__confirm_and_upgrade,
+                      command_arg=plugin_ids or '--all')
 
     def _disable(self, plugin_id):
         path = global_server.get_plugin_file_path(plugin_id)
@@ -420,9 +1556,12 @@ class PluginManager:
             return global_server.disable_plugin(plugin_id)
         except FileExistsError:
             pass
+        finally:
+            self.invalidate()
         return path
 
     @utils.check_lock
+    @utils.localized
     def disable(self, src: CommandSource, plugin_id):
         plugin = self.plugins.get(plugin_id, None)
         if not plugin:
@@ -473,39 +1612,138 @@ class PluginManager:
         else:
             return RTextList(name_and_version, installed, '\n', desc)
 
-    def filter(self, index: str, sort_by: str = 'name', page: int = None, page_size: int = None, keyword: str = None) -> List[Plugin]:
-        def get_page(lst, page, page_size):
-            if not page_size:
-                return lst
-            start = (page - 1) * page_size
-            end = start + page_size
-            return lst[start:end]
+    def _render_cached(self, key: tuple, render: Callable[[], RTextBase]) -> RTextBase:
+        """
+        Render a text once and cache it (LRU) until the catalogue, installed plugins or MCDR language change.
+        Texts are cached per translation language of the thread, `key` must cover everything else the text depends on.
+        """
+        state = (self.catalogue.generation, self.installed_version, global_server.get_mcdr_language())
+        key = (utils.translator.language,) + key
+        with self._rendered_lock:
+            if self._rendered_state != state:
+                self._rendered.clear()
+                self._rendered_state = state
+            text = self._rendered.get(key)
+            if text is not None:
+                self._rendered.move_to_end(key)
+                return text
+        text = render()
+        with self._rendered_lock:
+            if self._rendered_state == state:
+                self._rendered[key] = text
+                while len(self._rendered) > RENDER_CACHE_SIZE:
+                    self._rendered.popitem(last=False)
+        return text
+
+    def render_row(self, src: CommandSource, local: Metadata, plugin: Plugin = None, language: str = 'en_us') -> RTextBase:
+        """Cached `generate_rtext`.
+        """
+        meta = plugin.meta if plugin else local
+        key = ('row', meta.id, plugin is not None, language, src.is_player, str(local.version) if local else None)
+        return self._render_cached(key, lambda: self.generate_rtext(src, local, plugin, language))
+
+    @utils.localized
+    def render_benchmark(self, src: CommandSource, rounds: int = 100):
+        """
+        Time rendering the first page of `all`, from scratch and from the (warmed) render cache.
+        """
+        page = self.filter('all', 'name', 1, self.config.page_size)
+        language = src.get_preference().language
+        def render(row):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for p in page:
+                    row(src, self.plugins.get(p.meta.id, None), p, language)
+            return (time.perf_counter() - start) / rounds * 1000
+        uncached = render(self.generate_rtext)
+        render(self.render_row)
+        cached = render(self.render_row)
+        utils.print_msg(src, utils.trans('§lRender benchmark§r: {} rows per page, {} rounds', len(page), rounds))
+        utils.print_msg(src, utils.trans('    Without cache: {:.3f} ms per page', uncached))
+        utils.print_msg(src, utils.trans('    With cache: {:.3f} ms per page', cached))
+
+    @utils.localized
+    def trans_benchmark(self, src: CommandSource, rounds: int = 100000):
+        """
+        Measure `utils.trans` throughput in the current language, for a static message and a formatted one.
+        """
+        messages = [('Your plugins are all latest!', ()), ('Downloading {} plugin(s)...', (3,))]
+        utils.print_msg(src, utils.trans('§lTranslation benchmark§r: {}, {} rounds', utils.translator.language, rounds))
+        for msg, args in messages:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                utils.trans(msg, *args)
+            utils.print_msg(src, utils.trans('    "{}": {:.0f} calls/s', msg, rounds / (time.perf_counter() - start)))
+
+    @utils.localized
+    def memory_report(self, src: CommandSource):
+        """
+        Report memory used by the catalogue model: the compact form as loaded, and the size it would take
+        with all releases parsed, as every plugin was before releases became lazy.
+        """
+        plugins = list(self.catalogue.plugins)
+        count = max(len(plugins), 1)
+        compact = utils.deep_sizeof(plugins)
+        parsed = compact + utils.deep_sizeof([p.parse_releases() for p in plugins if not p.materialized])
+        utils.print_msg(src, utils.trans('§lCatalogue memory§r: {} plugins, releases of {} parsed',
+                                         len(plugins), len([p for p in plugins if p.materialized])))
+        utils.print_msg(src, utils.trans('    Compact: {:.1f} KiB, {} B per plugin', compact / 1024, compact // count))
+        utils.print_msg(src, utils.trans('    All releases parsed: {:.1f} KiB, {} B per plugin', parsed / 1024, parsed // count))
+
+    def _view(self, index: str, sort_by: Optional[str] = 'name', keyword: str = None) -> Tuple[Plugin, ...]:
+        """
+        Get filtered and sorted plugins of an index. Views are cached (LRU) until the catalogue or installed plugins change.
+        """
+        state = (self.catalogue.generation, self.installed_version)
+        key = (index, sort_by, keyword)
+        with self._views_lock:
+            if self._views_state != state:
+                self._views.clear()
+                self._views_state = state
+            view = self._views.get(key)
+            if view is not None:
+                self._views.move_to_end(key)
+                return view
+
         if index == 'outdated':
             outdated_plugins = self.outdated_plugins
             plugins = self.catalogue.filter(sort_by, plugin_list=outdated_plugins, keyword=keyword)
         elif index == 'all':
             plugins = self.catalogue.filter(sort_by, keyword=keyword)
         elif index == 'installed':
-            plugins = self.catalogue.filter(sort_by, plugin_list=self.plugins.keys(), keyword=keyword)
+            plugins = self.catalogue.filter(sort_by, plugin_list=self._plugins.keys(), keyword=keyword)
         else:
             plugins = self.catalogue.filter(sort_by, label=index, keyword=keyword)
-        if page:
-            return get_page(plugins, page, page_size)
-        return plugins
+        view = tuple(plugins)
+
+        with self._views_lock:
+            if self._views_state == state:
+                self._views[key] = view
+                while len(self._views) > VIEW_CACHE_SIZE:
+                    self._views.popitem(last=False)
+        return view
+
+    def filter(self, index: str, sort_by: str = 'name', page: int = None, page_size: int = None, keyword: str = None) -> List[Plugin]:
+        plugins = self._view(index, sort_by, keyword)
+        if page and page_size:
+            start = (page - 1) * page_size
+            return list(plugins[start:start + page_size])
+        return list(plugins)
 
-    def max_page(self, index: str, page_size: int, keyword: str = None):
-        plugins = self.filter(index, keyword=keyword)
+    def max_page(self, index: str, page_size: int, keyword: str = None, sort_by: Optional[str] = None):
+        plugins = self._view(index, sort_by, keyword)
         return (len(plugins) + page_size - 1) // page_size
 
+    @utils.localized
     def browse(self, src: CommandSource, index: str, sort_by: str = 'name', page: int = 1, page_size: int = None, keyword: str = None):
         if index == 'outdated' and not self.outdated_plugins:
             src.reply(RText(utils.trans('Your plugins are all latest!'), RColor.green))
             return
         plugins = self.filter(index, sort_by, page, page_size, keyword=keyword)
         for p in plugins:
-            src.reply(self.generate_rtext(src, self.plugins.get(p.meta.id, None), p, src.get_preference().language))
+            src.reply(self.render_row(src, self.plugins.get(p.meta.id, None), p, src.get_preference().language))
         if page_size:
-            max_page = self.max_page(index, page_size, keyword)
+            max_page = self.max_page(index, page_size, keyword, sort_by)
             if max_page > 1:
                 page_menu = RTextList('§7[ ')
                 if keyword:
@@ -521,8 +1759,11 @@ class PluginManager:
                 page_menu.append('§7]')
                 src.reply(page_menu)
 
+    @utils.localized
     def info(self, src: CommandSource, plugin_id: str):
         if plugin_id in self.catalogue.plugins:
-            src.reply(self.catalogue.plugins[plugin_id].get_info_rtext(self.plugins.get(plugin_id, None)))
+            local = self.plugins.get(plugin_id, None)
+            src.reply(self._render_cached(('info', plugin_id, str(local.version) if local else None),
+                                          lambda: self.catalogue.plugins[plugin_id].get_info_rtext(local)))
         else:
             src.reply(self.plugins[plugin_id].get_info_rtext())
@@ -1,6 +1,6 @@
 import sys
+from typing import List
 
-import ruamel.yaml as yaml
 from mcdreforged.api.all import Serializable, ServerInterface
 
 
@@ -11,6 +11,15 @@ class Configuration(Serializable):
     check_upgrade: bool = True
     plugin_folder: str = 'plugins'
     page_size: int = 6
+    extract_catalogue: bool = False
+    download_threads: int = 4
+    connect_timeout: float = 10
+    read_timeout: float = 30
+    retries: int = 3
+    asset_cache_size: int = 256
+    asset_cache_folder: str = ''
+    mirrors: List[str] = []
+    pip_constraints: str = ''
 
 
 class NegativeInfinity:
@@ -34,16 +43,25 @@ PYTHON = sys.executable
 
 PLUGIN_ID = 'aluminum'
 PLUGIN_VERSION = '0.1.3'
-PLUGIN_DESCRIPTION = 'Anothoer Plugin Manager'
 PLUGIN_FOLDER = global_server.get_mcdr_config()['plugin_directories'][0]
 PLUGIN_CATALOGUE = 'MCDReforged/PluginCatalogue/archive/refs/heads/meta.zip'
+CATALOGUE_SNAPSHOT_VERSION = 2
+CATALOGUE_FILES = ('plugin.json', 'release.json', 'meta.json')
+CATALOGUE_SPOOL_SIZE = 16 * 1024 * 1024
+MIRROR_PROBE_SIZE = 64 * 1024
+MIRROR_PROBE_INTERVAL = 24 * 3600
 PREFIX = ['!!al', '!!aluminum']
 
 INDEXES = ['api', 'information', 'tool', 'management', 'outdated', 'installed', 'all']
 SORTS = ['labels', 'authors', 'name']
 PAGE_SIZE = 6
+VIEW_CACHE_SIZE = 64
+RENDER_CACHE_SIZE = 512
+INSTALLED_SNAPSHOT_TTL = 5
 
 DEPENDENCY_BLACKLIST = ['python', 'mcdreforged']
+RESOLVE_ROUNDS = 32
+RESOLVE_ATTEMPTS = 64
 
 RELOADED_BANNER = f'§3Aluminum {PLUGIN_VERSION} initialized!'
 LOADED_BANNER = f'''                            
@@ -54,7 +72,3 @@ LOADED_BANNER = f'''
 
 {RELOADED_BANNER}
 '''
-
-with global_server.open_bundled_file('trans\zh_cn.yml') as f:
-    TRANSLATION = yaml.safe_load(f)
-
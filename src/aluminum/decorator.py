@@ -128,7 +128,14 @@ class CommandBuilder:
             self._server.register_help_message(self.literal[0], self._help_msg)
 
 
-def execute_on_second_time(timeout_seconds, operation, command):
+def execute_on_second_time(timeout_seconds, operation, command, describe=None):
+    """
+    Only execute the decorated method when the same command is sent twice within `timeout_seconds`.
+
+    `operation` is a translation key, translated when the command is sent.
+
+    `describe(arg, *args, **kwargs)`, if given, returns lines shown to the user instead of `arg`.
+    """
     sources = {}
 
     def decorator(func):
@@ -144,8 +151,12 @@ def execute_on_second_time(timeout_seconds, operation, command):
                 sources.pop(src_id)
                 if last[0] == str(arg):
                     return func(s, src, arg, *args, **kwargs)
-            print_msg(src, trans('▶ You\'re §l{}§r following plugin(s):', operation))
-            print_msg(src, f'  §e§l{arg}§r')
+            print_msg(src, trans('▶ You\'re §l{}§r following plugin(s):', trans(operation)))
+            if describe:
+                for line in describe(arg, *args, **kwargs):
+                    print_msg(src, line)
+            else:
+                print_msg(src, f'  §e§l{arg}§r')
             print_msg(src, RTextList(
                 RText(trans('§3§lExecute same command again')). \
                     c(RAction.run_command, command.format(arg)). \
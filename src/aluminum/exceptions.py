@@ -8,6 +8,11 @@ class NetworkError(AluminumException):
     pass
 
 
+class DownloadVerifyError(NetworkError):
+    """Downloaded file doesn't match the expected size or checksum."""
+    pass
+
+
 class CatalogueUpdateError(AluminumException):
     """Failed to update plugin catalogue."""
     pass
@@ -33,6 +38,22 @@ class DependencyInstallError(AluminumException):
     pass
 
 
+class DependencyResolveError(AluminumException):
+    """Error while resolving dependencies."""
+    pass
+
+
+class DependencyConflictError(DependencyResolveError):
+    """No release satisfies all requirements on a plugin."""
+    # (plugin id, version) of the chosen releases whose requirements conflict
+    culprits = ()
+
+
+class DependencyCycleError(DependencyResolveError):
+    """Plugins to install depend on each other."""
+    pass
+
+
 class RequirementInstallError(AluminumException):
     """Error while installing requirements."""
     pass
@@ -1,18 +1,28 @@
+import hashlib
+import importlib.metadata
 import os
 import sched
+import shutil
+import sys
 import threading
 import time
 import zipfile
-from typing import Any, Callable, List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
 
 import requests
+import ruamel.yaml as yaml
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from mcdreforged.api.decorator import new_thread
+from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
 from mcdreforged.api.rtext import RColor, RText, RTextBase
 from mcdreforged.api.types import CommandSource
 from mcdreforged.utils.serializer import Serializable
 
-from aluminum.constant import PLUGIN_ID, global_server, TRANSLATION
-from aluminum.exceptions import CorruptedOnlineMetaError, NetworkError
+from aluminum.constant import PLUGIN_ID, PLUGIN_VERSION, global_server
+from aluminum.exceptions import CorruptedOnlineMetaError, DownloadVerifyError, NetworkError
 
 
 class ValueDict(dict):
@@ -43,15 +53,25 @@ class TaskScheduler:
         self.arguments = arguments
         self.tasks = {}
         self.lock = threading.Lock()
+        self.timer = None
+        self.stopped = False
     
     def start(self):
+        if self.stopped:
+            return
         self.target(*self.arguments)
-        self.timer = threading.Timer(self.interval, self.start)
-        self.timer.setName(self.thread_name)
-        self.timer.start()
+        with self.lock:
+            if self.stopped:
+                return
+            self.timer = threading.Timer(self.interval, self.start)
+            self.timer.setName(self.thread_name)
+            self.timer.start()
     
     def stop(self):
-        self.timer.cancel()
+        with self.lock:
+            self.stopped = True
+            if self.timer:
+                self.timer.cancel()
 
 
 def check_lock(func):
@@ -82,46 +102,458 @@ def print_msg(src: Optional[CommandSource], msg, color: RColor = None, console=T
             console_print(msg)
 
 
-def trans(msg, *args):
-    if global_server.get_mcdr_language() == 'zh_cn':
+class Translator:
+    """
+    Translations of all bundled `trans/<language>.yml` files, loaded once on first use.
+
+    Messages are English and double as translation keys. A message missing from a language,
+    or a language without a translation file, falls back to English.
+    """
+    FOLDER = 'trans'
+
+    def __init__(self) -> None:
+        self._tables: Optional[Dict[str, Dict[str, str]]] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _bundled_files(self) -> List[str]:
+        path = global_server.get_plugin_file_path(PLUGIN_ID)
+        if path and os.path.isdir(path):
+            return os.listdir(os.path.join(path, self.FOLDER))
+        if path and zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as zip:
+                prefix = f'{self.FOLDER}/'
+                return [name[len(prefix):] for name in zip.namelist() if name.startswith(prefix)]
+        return []
+
+    def load(self) -> Dict[str, Dict[str, str]]:
+        """Parse every bundled translation file once. Template strings are interned, as they're looked up on every message.
+        """
+        with self._lock:
+            if self._tables is None:
+                tables = {}
+                for file in self._bundled_files():
+                    language, ext = os.path.splitext(file)
+                    if ext not in ('.yml', '.yaml'):
+                        continue
+                    with global_server.open_bundled_file(f'{self.FOLDER}/{file}') as f:
+                        table = yaml.safe_load(f) or {}
+                    tables[language] = {str(k): sys.intern(str(v)) for k, v in table.items()}
+                self._tables = tables
+            return self._tables
+
+    @contextmanager
+    def language_of(self, src: Optional[CommandSource]):
+        """Translate messages in this thread into the preferred language of `src`.
+        """
+        previous = getattr(self._local, 'language', None)
+        self._local.language = src.get_preference().language if src is not None else None
         try:
-            msg = TRANSLATION[msg]
-        except:
-            msg = f'[未译: {msg}]'
-    if args:
-        msg = msg.format(*args)
-    return msg
+            yield
+        finally:
+            self._local.language = previous
 
+    @property
+    def language(self) -> str:
+        return getattr(self._local, 'language', None) or global_server.get_mcdr_language()
 
-def download_file(file_url: str, name: str, path: str):
-    """Download a file from the Internet.
+    def translate(self, msg: str, *args, language: Optional[str] = None) -> str:
+        """Translate a message into `language`, or the current language, then format it with `args`.
 
-    Args:
-        file_url (str): The URL of target file.
-        name (str): The path to save the file.
+        Static messages are returned straight from the loaded table, without formatting.
+        This is called for nearly every message, so the `language` lookup is inlined.
+        """
+        tables = self._tables if self._tables is not None else self.load()
+        table = tables.get(language or getattr(self._local, 'language', None) or global_server.get_mcdr_language())
+        if table:
+            msg = table.get(msg, msg)
+        return msg.format(*args) if args else msg
+
+
+translator = Translator()
+trans = translator.translate
+
+
+def localized(func):
     """
+    Decorator to wrap a `(self, source, ...)` method, so messages in it are translated into the source's language.
+    """
+    def wrapper(s, source, *args, **kwargs):
+        with translator.language_of(source):
+            return func(s, source, *args, **kwargs)
+    return wrapper
 
-    try:
-        path = os.path.join(path, name)
-        r = requests.get(file_url, stream=True)
-        with open(path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
-    except requests.RequestException as e:
-        raise NetworkError(e)
 
+class HttpClient:
+    """
+    A pooled HTTP client shared by catalogue updates and plugin downloads.
+
+    Connections are kept alive and reused, requests time out, and transient failures
+    (connection errors, 429 and 5xx responses) are retried with exponential backoff.
+    """
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+    MIN_CHUNK = 64 * 1024
+    MAX_CHUNK = 1024 * 1024
+
+    def __init__(self, connect_timeout: float = 10, read_timeout: float = 30, retries: int = 3,
+                 backoff: float = 0.5, pool_size: int = 4) -> None:
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = f'{PLUGIN_ID}/{PLUGIN_VERSION}'
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=self.RETRY_STATUS,
+                      allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, file_url: str, headers: Optional[dict] = None) -> requests.Response:
+        r = self.session.get(file_url, stream=True, headers=headers, timeout=self.timeout)
+        r.raise_for_status()
+        return r
+
+    def chunk_size(self, r: requests.Response) -> int:
+        """Pick a chunk size from the response size: about 1/16 of the body, clamped to [64 KiB, 1 MiB].
+        """
+        try:
+            length = int(r.headers.get('Content-Length'))
+        except (TypeError, ValueError):
+            return self.MAX_CHUNK
+        return min(self.MAX_CHUNK, max(self.MIN_CHUNK, length // 16))
+
+    def write(self, r: requests.Response, f: BinaryIO) -> int:
+        written = 0
+        for chunk in r.iter_content(chunk_size=self.chunk_size(r)):
+            if chunk:
+                f.write(chunk)
+                written += len(chunk)
+        return written
+
+    def download(self, file_url: str, f: BinaryIO, headers: Optional[dict] = None) -> requests.Response:
+        """Download a file from the Internet into a file-like object.
+
+        Args:
+            file_url (str): The URL of target file.
+            f (BinaryIO): A writable binary file-like object, e.g. a `SpooledTemporaryFile`.
+            headers (dict, optional): Extra request headers, e.g. conditional request validators.
+
+        Returns:
+            requests.Response: The response. Nothing is written if the server replies 304 Not Modified.
+        """
+        try:
+            with self.get(file_url, headers) as r:
+                if r.status_code != 304:
+                    self.write(r, f)
+                return r
+        except requests.RequestException as e:
+            raise NetworkError(e)
+
+    def download_file(self, file_url: str, name: str, path: str, headers: Optional[dict] = None,
+                      size: Optional[int] = None, sha256: Optional[str] = None,
+                      part: Optional[str] = None) -> requests.Response:
+        """Download a file from the Internet.
+
+        The file is written to a `.part` file first and renamed to `name` only after it's verified,
+        so a truncated file never shows up at the final path. A `.part` file left by a failed attempt
+        is resumed with a Range request, guarded by If-Range so a changed file is fetched from scratch.
+
+        Args:
+            file_url (str): The URL of target file.
+            name (str): The name to save the file as.
+            path (str): The folder to save the file in.
+            headers (dict, optional): Extra request headers, e.g. conditional request validators.
+            size (int, optional): Expected size in bytes. Defaults to the size the server reports.
+            sha256 (str, optional): Expected SHA-256 hex digest.
+            part (str, optional): Where to keep the partial file. Defaults to `<path>/<name>.part`.
+                Put it somewhere that outlives `path` to resume across attempts.
+
+        Returns:
+            requests.Response: The response. Nothing is written if the server replies 304 Not Modified.
+
+        Raises:
+            NetworkError: The download failed after retries.
+            DownloadVerifyError: The downloaded file has a wrong size or checksum.
+        """
+        target = os.path.join(path, name)
+        part = part or f'{target}.part'
+        for attempt in range(self.retries + 1):
+            try:
+                return self._download_part(file_url, target, part, headers, size, sha256)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                # The body was cut off, keep the `.part` file and resume
+                if attempt == self.retries:
+                    raise NetworkError(e)
+                time.sleep(self.backoff * (2 ** attempt))
+            except requests.RequestException as e:
+                raise NetworkError(e)
+
+    def _download_part(self, file_url: str, target: str, part: str, headers: Optional[dict],
+                       size: Optional[int], sha256: Optional[str]) -> requests.Response:
+        offset = os.path.getsize(part) if os.path.isfile(part) else 0
+        request_headers = dict(headers or {})
+        if offset:
+            request_headers['Range'] = f'bytes={offset}-'
+            validator = self._read_validator(part)
+            if validator:
+                request_headers['If-Range'] = validator
+        with self.session.get(file_url, stream=True, headers=request_headers, timeout=self.timeout) as r:
+            if r.status_code == 304:
+                return r
+            if r.status_code == 416 and offset:
+                # The partial file is stale or longer than the remote file
+                self._discard(part)
+                return self._download_part(file_url, target, part, headers, size, sha256)
+            r.raise_for_status()
+            expected = size
+            if r.status_code == 206 and r.headers.get('Content-Range', '').startswith(f'bytes {offset}-'):
+                mode = 'ab'
+                total = r.headers['Content-Range'].rpartition('/')[2]
+                if expected is None and total.isdigit():
+                    expected = int(total)
+            else:
+                mode = 'wb'
+                if expected is None and is_integer(r.headers.get('Content-Length')) and 'Content-Encoding' not in r.headers:
+                    expected = int(r.headers['Content-Length'])
+                self._write_validator(part, r.headers.get('ETag') or r.headers.get('Last-Modified'))
+            with open(part, mode) as f:
+                self.write(r, f)
+        actual = os.path.getsize(part)
+        if expected is not None and actual < expected:
+            raise requests.exceptions.ChunkedEncodingError(f'Got {actual} of {expected} bytes')
+        if expected is not None and actual > expected:
+            self._discard(part)
+            raise DownloadVerifyError(f'Size mismatch: expected {expected} bytes, got {actual}')
+        if sha256 and file_sha256(part) != sha256.lower():
+            self._discard(part)
+            raise DownloadVerifyError(f'SHA-256 mismatch: {os.path.basename(target)}')
+        os.replace(part, target)
+        self._discard(part)
+        return r
+
+    @staticmethod
+    def _read_validator(part: str) -> Optional[str]:
+        try:
+            with open(f'{part}.validator', 'r', encoding='utf8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_validator(part: str, validator: Optional[str]) -> None:
+        with open(f'{part}.validator', 'w', encoding='utf8') as f:
+            f.write(validator or '')
 
-def unzip(file, path):
+    @staticmethod
+    def _discard(part: str) -> None:
+        for file in (part, f'{part}.validator'):
+            if os.path.isfile(file):
+                os.remove(file)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class RequirementChecker:
+    """
+    Check python requirements against installed distributions, like `pkg_resources.require` without its import cost.
+
+    Installed versions are read with `importlib.metadata` on first use and cached until `invalidate()`.
+    Unlike `pkg_resources`, requirements of the required distribution are not checked recursively.
+    """
+    SATISFIED = 'satisfied'
+    MISSING = 'missing'
+    CONFLICT = 'conflict'
+
+    def __init__(self) -> None:
+        self._versions: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def versions(self) -> Dict[str, str]:
+        """
+        Normalized distribution name -> installed version.
+        """
+        with self._lock:
+            if self._versions is None:
+                versions = {}
+                for dist in importlib.metadata.distributions():
+                    name = dist.metadata['Name']
+                    if name:
+                        # The first one on sys.path wins, same as the import system
+                        versions.setdefault(canonicalize_name(name), dist.version)
+                self._versions = versions
+            return self._versions
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._versions = None
+        importlib.invalidate_caches()
+
+    def check(self, requirement: str) -> Tuple[str, Optional[str]]:
+        """Check a requirement string, e.g. `requests>=2.0`.
+
+        Returns:
+            One of `SATISFIED`, `MISSING` and `CONFLICT`, with the installed version.
+
+        Raises:
+            packaging.requirements.InvalidRequirement: The requirement can't be parsed.
+        """
+        req = Requirement(requirement)
+        version = self.versions.get(canonicalize_name(req.name))
+        if req.marker is not None and not req.marker.evaluate():
+            return self.SATISFIED, version
+        if version is None:
+            return self.MISSING, None
+        if req.specifier.contains(version, prereleases=True):
+            return self.SATISFIED, version
+        return self.CONFLICT, version
+
+
+class FileLock:
+    """
+    Lock shared between processes by locking a file, and between threads of this process. Reentrant.
+    The OS releases the file lock if a process dies holding it.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self) -> 'FileLock':
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                self._file = open(self.path, 'a+b')
+                self._lock_file(True)
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._lock_file(False)
+            finally:
+                self._file.close()
+                self._file = None
+        self._lock.release()
+
+    def _lock_file(self, lock: bool) -> None:
+        if os.name == 'nt':
+            import msvcrt
+            self._file.seek(0)
+            if not lock:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+                return
+            while True:
+                try:
+                    # Retries for about 10 seconds before raising
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    return
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if lock else fcntl.LOCK_UN)
+
+
+def read_zip(file: Union[str, BinaryIO], accept: Callable[[zipfile.ZipInfo], bool],
+             extract_to: Optional[str] = None) -> List[Tuple[zipfile.ZipInfo, bytes]]:
+    """Read accepted members of a zip file.
+
+    Each member is decompressed only once, and its CRC is checked while decompressing.
+
+    Args:
+        file (str | BinaryIO): Path or file-like object of the zip file.
+        accept (Callable[[ZipInfo], bool]): Whether a member should be read.
+        extract_to (str, optional): Also extract the whole zip file here. For debugging.
+
+    Raises:
+        CorruptedOnlineMetaError: The zip file is broken.
+    """
     try:
         with zipfile.ZipFile(file) as zip:
-            if zip.testzip():
-                raise CorruptedOnlineMetaError(f'File {file} is broken')
-            zip.extractall(path)
+            members = [(info, zip.read(info)) for info in zip.infolist() if accept(info)]
+            if extract_to:
+                zip.extractall(extract_to)
+        return members
     except Exception as e:
         raise CorruptedOnlineMetaError(e)
 
 
+def file_sha256(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def fingerprint(*entries: Tuple[int, int]) -> str:
+    """Combine (crc32, size) of files into a fingerprint.
+
+    These are the same values `zipfile.ZipInfo` exposes as `CRC` and `file_size`.
+    """
+    return '-'.join(f'{crc:08x}:{size}' for crc, size in entries)
+
+
+def atomic_write(path: str, text: str) -> None:
+    """Write a text file via a temporary file and a rename, so readers never see a partial file.
+    """
+    temp = f'{path}.tmp'
+    with open(temp, 'w', encoding='utf8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+
+def replace_folder(src: str, dst: str) -> None:
+    """Replace folder `dst` with `src` by renaming.
+    """
+    old = f'{dst}.old'
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.isdir(dst):
+        os.rename(dst, old)
+    os.rename(src, dst)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def deep_sizeof(*objs: Any) -> int:
+    """Approximate memory used by objects and everything they refer to. Shared objects are counted once.
+    """
+    seen = set()
+    stack = list(objs)
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        if hasattr(obj, '__dict__'):
+            stack.append(vars(obj))
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return size
+
+
 def touch(path):
     if not os.path.isdir(path):
         os.makedirs(path)